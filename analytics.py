@@ -0,0 +1,84 @@
+import io
+import sqlite3
+
+import pandas as pd
+
+from catalog import PDCA_PHASES
+from usage import USAGE_DB_PATH
+
+# ✅ Chart key -> title shown in the Analytics tab
+CHARTS = {
+    "phase": "Tool usage by PDCA phase",
+    "trend": "Usage over time",
+    "pairs": "Most combined tools",
+}
+
+_QUERIES = {
+    "phase": "SELECT phase, kind, count FROM rollup_phase",
+    "trend": "SELECT day, kind, count FROM rollup_daily WHERE day >= date('now', ?) ORDER BY day",
+    "pairs": "SELECT tool_a, tool_b, count FROM rollup_pairs ORDER BY count DESC, tool_a, tool_b LIMIT ?",
+}
+
+
+def _connect(path):
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+
+
+def rollup_version(path=USAGE_DB_PATH):
+    """Bumped by the usage writer after every batch; 0 when nothing has been recorded."""
+    try:
+        conn = _connect(path)
+    except sqlite3.OperationalError:
+        return 0
+    try:
+        row = conn.execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def load_rollup(chart, path=USAGE_DB_PATH, days=90, top=15):
+    params = {"phase": (), "trend": (f"-{days} days",), "pairs": (top,)}[chart]
+    conn = _connect(path)
+    try:
+        return pd.read_sql_query(_QUERIES[chart], conn, params=params)
+    finally:
+        conn.close()
+
+
+def render_chart(chart, frame):
+    """PNG bytes for one rollup, or None if there is nothing to plot yet."""
+    if frame.empty:
+        return None
+
+    # pyplot keeps global state and is not safe across session threads; use a bare Figure
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    if chart == "phase":
+        table = frame.pivot_table(index="phase", columns="kind", values="count", fill_value=0)
+        table = table.reindex([p for p in PDCA_PHASES if p in table.index])
+        table.plot.bar(ax=ax, stacked=True, rot=0)
+        ax.set_xlabel("")
+        ax.set_ylabel("Events")
+    elif chart == "trend":
+        table = frame.pivot_table(index="day", columns="kind", values="count", fill_value=0)
+        table.index = pd.to_datetime(table.index)
+        table.plot(ax=ax, marker="o")
+        ax.set_xlabel("")
+        ax.set_ylabel("Events per day")
+    elif chart == "pairs":
+        labels = frame["tool_a"] + " + " + frame["tool_b"]
+        ax.barh(labels[::-1], frame["count"][::-1], color="#2DBE9C")
+        ax.set_xlabel("Plans using both")
+    else:
+        raise ValueError(f"Unknown chart: {chart}")
+
+    ax.set_title(CHARTS[chart])
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
@@ -0,0 +1,120 @@
+"""Render Project Plan exports for many projects without the UI.
+
+    python batch_export.py manifest.json --out exports/ --formats csv,excel,txt,pdf --workers 8
+
+The manifest is a JSON list (or JSON Lines file) of projects:
+
+    {"project_name": "Alpha", "project_owner": "Sam", "created_date": "01-04-2026",
+     "selected_tools": {"Plan": ["MoSCoW"], "Do": ["Kaizen"], "Check": [], "Act": []}}
+
+Each project gets its own folder holding the same files the Project Plan tab
+offers for download, rendered by the same code in exports.py.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog import CATALOG_FALLBACK, read_catalog, tool_descriptions
+from excel_export import write_plan_xlsx
+from exports import EXPORT_FORMATS, build_plan_rows, export_bytes, plan_dataframe, plan_rows, render_export
+from pdf_export import write_plan_pdf
+
+_descriptions = None
+
+
+def _init_worker(catalog_path, fallback):
+    """Load the tool descriptions once per worker process; plans need nothing else from the catalog."""
+    global _descriptions
+    _descriptions = tool_descriptions(read_catalog(catalog_path, fallback))
+
+
+def read_manifest(path):
+    with open(path, encoding="utf-8") as manifest_file:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in manifest_file if line.strip()]
+        return json.load(manifest_file)
+
+
+def project_dirname(project, position):
+    name = re.sub(r"[^\w.-]+", "_", project.get("project_name") or "").strip("._") or "Untitled"
+    return f"{position:05d}_{name}"
+
+
+def render_project(job):
+    """Render every requested format for one project; returns (files written, bytes written)."""
+    project, out_dir, formats, phase_sheets = job
+    rows = build_plan_rows(project.get("selected_tools", {}), lambda tool: _descriptions.get(tool, ""))
+    plan_df = plan_dataframe(rows)
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    fields = (project.get("project_name", ""), project.get("project_owner", ""), project.get("created_date", ""))
+    for fmt in formats:
+        with open(os.path.join(out_dir, EXPORT_FORMATS[fmt][1]), "wb") as out_file:
+            # PDF pages and Excel rows are streamed straight to disk
+            if fmt == "pdf":
+                write_plan_pdf(plan_df, *fields, out_file)
+            elif fmt == "excel":
+                write_plan_xlsx(plan_rows(plan_df), out_file, phase_sheets=phase_sheets)
+            else:
+                out_file.write(export_bytes(render_export(fmt, plan_df, *fields)))
+            written += out_file.tell()
+    return len(formats), written
+
+
+def run(manifest, out, formats, workers=None, catalog_path=None, fallback=CATALOG_FALLBACK,
+        phase_sheets=False):
+    projects = read_manifest(manifest)
+    jobs = [
+        (project, os.path.join(out, project_dirname(project, i)), formats, phase_sheets)
+        for i, project in enumerate(projects)
+    ]
+
+    started = time.perf_counter()
+    files = total_bytes = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog_path, fallback)) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        for written_files, written_bytes in pool.map(render_project, jobs, chunksize=chunksize):
+            files += written_files
+            total_bytes += written_bytes
+    elapsed = time.perf_counter() - started
+
+    return {
+        "projects": len(projects),
+        "files": files,
+        "bytes": total_bytes,
+        "seconds": elapsed,
+        "projects_per_second": len(projects) / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render Project Plan exports for every project in a manifest.")
+    parser.add_argument("manifest", help="JSON list or .jsonl file of projects")
+    parser.add_argument("--out", default="exports", help="output directory (default: exports)")
+    parser.add_argument("--formats", default=",".join(EXPORT_FORMATS),
+                        help=f"comma-separated subset of {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--catalog", default=None,
+                        help="catalog CSV or .arrow file (default: the app's catalog, compiled artifact if newer)")
+    parser.add_argument("--excel-phase-sheets", action="store_true",
+                        help="add a formatted sheet per PDCA phase to the Excel workbook")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(unknown)}")
+
+    report = run(args.manifest, args.out, formats, workers=args.workers, catalog_path=args.catalog,
+                 phase_sheets=args.excel_phase_sheets)
+    print(f"{report['projects']} projects, {report['files']} files, {report['bytes'] / 1e6:.1f} MB "
+          f"in {report['seconds']:.2f}s ({report['projects_per_second']:.1f} projects/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
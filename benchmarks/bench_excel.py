@@ -0,0 +1,78 @@
+"""Project Plan Excel: streaming constant_memory writer vs pd.ExcelWriter.
+
+    python benchmarks/bench_excel.py --sizes 1000,10000,50000
+
+Reports wall time and tracemalloc peak. The streaming writer is also run
+straight to a file with per-phase sheets, the way batch_export.py uses it.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import PDCA_PHASES  # noqa: E402
+from excel_export import write_plan_xlsx  # noqa: E402
+from exports import plan_dataframe, render_excel, render_excel_pandas  # noqa: E402
+
+
+def synthetic_rows(tasks):
+    return [
+        {
+            "PDCA Phase": PDCA_PHASES[i * 4 // tasks] if tasks else "Plan",
+            "Task Name": f"Tool {i}",
+            "Description": f"Description of tool {i}, long enough to look like a real catalog entry.",
+        }
+        for i in range(tasks)
+    ]
+
+
+def _to_file(rows):
+    """Stream plan rows to a temporary .xlsx with per-phase sheets; returns the file size."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "plan.xlsx")
+        write_plan_xlsx(((r["PDCA Phase"], r["Task Name"], r["Description"]) for r in rows), path,
+                        phase_sheets=True)
+        return os.path.getsize(path)
+
+
+def measure(render, arg):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = render(arg)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak, "output_bytes": result if isinstance(result, int) else len(result)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        rows = synthetic_rows(size)
+        plan_df = plan_dataframe(rows)
+        results.append({"tasks": size, "writer": "pandas", **measure(render_excel_pandas, plan_df)})
+        results.append({"tasks": size, "writer": "streaming", **measure(render_excel, plan_df)})
+        results.append({"tasks": size, "writer": "streaming-file", **measure(_to_file, rows)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'tasks':>7} {'writer':>15} {'time ms':>10} {'peak MB':>9} {'size KB':>9}")
+        for r in results:
+            print(f"{r['tasks']:>7} {r['writer']:>15} {r['seconds'] * 1000:>10.1f} "
+                  f"{r['peak_bytes'] / 1e6:>9.2f} {r['output_bytes'] / 1e3:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Discussion forum: FTS search and keyset paging on a large synthetic forum.
+
+    python benchmarks/bench_forum.py --threads 20000 --posts 300000
+
+Fills a temporary database in bulk, then times first and deep thread-list
+pages (overall and per tool tag), thread pages, and searches for the sample
+queries, first page and third page.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(BENCH_DIR), BENCH_DIR]
+
+from bench_suite import summarize  # noqa: E402
+from db import ConnectionPool  # noqa: E402
+from forum import ForumStore  # noqa: E402
+from synthetic import _WORDS, sample_queries  # noqa: E402
+
+
+def fill(store, threads, posts, tools=500, seed=0):
+    """Bulk-load threads, tags and posts straight through SQL; the FTS triggers still fire."""
+    rng = random.Random(seed)
+    started = time.time() - threads
+    with store.pool.connection() as conn:
+        conn.executemany(
+            "INSERT INTO forum_threads (id, title, author, created, last_post) VALUES (?, ?, ?, ?, ?)",
+            [(i, " ".join(rng.choice(_WORDS) for _ in range(5)), f"user{i % 97}", started + i, started + i)
+             for i in range(1, threads + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO forum_thread_tools (tool, last_post, thread_id) VALUES (?, ?, ?)",
+            [(f"Tool {i % tools}", started + i, i) for i in range(1, threads + 1)],
+        )
+        conn.executemany(
+            "INSERT INTO forum_posts (thread_id, author, body, created) VALUES (?, ?, ?, ?)",
+            [(rng.randint(1, threads), f"user{i % 97}", " ".join(rng.choice(_WORDS) for _ in range(30)), started)
+             for i in range(posts)],
+        )
+
+
+def timed_ms(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=20000)
+    parser.add_argument("--posts", type=int, default=300000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ForumStore(ConnectionPool(os.path.join(directory, "forum.db")))
+        load_ms, _ = timed_ms(fill, store, args.threads, args.posts)
+        results = {"threads": args.threads, "posts": args.posts, "load_ms": load_ms}
+
+        samples, deep, cursor = [], [], None
+        for page in range(100):
+            ms, (rows, cursor) = timed_ms(store.threads, after=cursor)
+            (samples if page == 0 else deep).append(ms)
+            if cursor is None:
+                break
+        results["threads_first_page"] = summarize(samples)
+        results["threads_deep_pages"] = summarize(deep)
+        results["threads_by_tool"] = summarize([timed_ms(store.threads, tool=f"Tool {i}")[0] for i in range(50)])
+        results["thread_posts"] = summarize([timed_ms(store.posts, i)[0] for i in range(1, 51)])
+
+        first, third = [], []
+        for query in sample_queries():
+            ms, (_, cursor) = timed_ms(store.search, query)
+            first.append(ms)
+            for _ in range(2):
+                if cursor is None:
+                    break
+                ms, (_, cursor) = timed_ms(store.search, query, before=cursor)
+            third.append(ms)
+        results["search_first_page"] = summarize(first)
+        results["search_third_page"] = summarize(third)
+        store.pool.close()
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Project Plan PDF: streaming writer vs the original FPDF loop.
+
+    python benchmarks/bench_pdf.py --sizes 10,1000,10000 --repeat 3
+
+Reports best-of-N wall time and tracemalloc peak for each renderer and plan size.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import PDCA_PHASES  # noqa: E402
+from exports import plan_dataframe, render_pdf, render_pdf_fpdf  # noqa: E402
+from pdf_export import write_plan_pdf  # noqa: E402
+
+
+class _CountingSink:
+    """Discards output but counts it, like writing the PDF straight to disk."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+    def __len__(self):
+        return self.size
+
+
+def render_to_sink(plan_df, project_name, project_owner, created_date):
+    sink = _CountingSink()
+    write_plan_pdf(plan_df, project_name, project_owner, created_date, sink)
+    return sink
+
+
+RENDERERS = {"fpdf": render_pdf_fpdf, "streaming": render_pdf, "streaming-file": render_to_sink}
+
+
+def synthetic_plan(tasks):
+    return plan_dataframe([
+        {
+            "PDCA Phase": PDCA_PHASES[i % 4],
+            "Task Name": f"Tool {i}",
+            "Description": f"Description of tool {i}, with (parentheses) and non-ASCII ✓ text to clean.",
+        }
+        for i in range(tasks)
+    ])
+
+
+def measure(render, plan_df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = render(plan_df, "Benchmark", "Owner", "01-01-2026")
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    render(plan_df, "Benchmark", "Owner", "01-01-2026")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak, "output_bytes": len(data)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        plan_df = synthetic_plan(size)
+        for name, render in RENDERERS.items():
+            results.append({"tasks": size, "renderer": name, **measure(render, plan_df, args.repeat)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'tasks':>7} {'renderer':>10} {'time ms':>10} {'peak MB':>9} {'size KB':>9}")
+        for r in results:
+            print(f"{r['tasks']:>7} {r['renderer']:>10} {r['seconds'] * 1000:>10.1f} "
+                  f"{r['peak_bytes'] / 1e6:>9.2f} {r['output_bytes'] / 1e3:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Co-occurrence recommender: bulk load, incremental updates and top-k queries.
+
+    python benchmarks/bench_recommend.py --tools 5000 --plans 200000
+
+Plans draw 4-20 tools from a skewed distribution (a few tools are in most
+plans, like the real catalog). Times the bulk build, single-plan updates
+(including the periodic compactions they trigger) and per-phase top-3
+queries for selections of 1-12 tools.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(BENCH_DIR), BENCH_DIR]
+
+from bench_suite import summarize  # noqa: E402
+from recommend import CooccurrenceMatrix  # noqa: E402
+
+PHASES = ["Plan", "Do", "Check", "Act"]
+
+
+def synthetic_plans(tools, plans, seed=0):
+    rng = random.Random(seed)
+    names = [f"Tool {i}" for i in range(tools)]
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(tools)))
+    for _ in range(plans):
+        yield set(rng.choices(names, cum_weights=cum_weights, k=rng.randint(4, 20)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tools", type=int, default=5000)
+    parser.add_argument("--plans", type=int, default=200000)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    matrix = CooccurrenceMatrix()
+    plans = list(synthetic_plans(args.tools, args.plans))
+    started = time.perf_counter()
+    matrix.add_plans(dict(enumerate(plans)))
+    results = {
+        "tools": len(matrix),
+        "plans": args.plans,
+        "pairs": int(len(matrix._data)),
+        "load_ms": (time.perf_counter() - started) * 1000,
+    }
+
+    updates = []
+    for key, plan in enumerate(synthetic_plans(args.tools, args.updates, seed=1)):
+        started = time.perf_counter()
+        matrix.set_plan(key, plan)
+        updates.append((time.perf_counter() - started) * 1000)
+    results["set_plan"] = summarize(updates)
+
+    rng = random.Random(2)
+    names = [f"Tool {i}" for i in range(args.tools)]
+    phase_tools = {phase: tuple(names[i::len(PHASES)]) for i, phase in enumerate(PHASES)}
+    queries = []
+    for _ in range(args.queries):
+        selected = rng.sample(names[:500], k=rng.randint(1, 12))
+        for phase in PHASES:
+            started = time.perf_counter()
+            matrix.recommend(selected, phase_tools[phase], k=3)
+            queries.append((time.perf_counter() - started) * 1000)
+    results["recommend"] = summarize(queries)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Load test: hundreds of concurrent AppTest sessions.
+
+    python benchmarks/bench_sessions.py --sessions 300 --processes 4 --reruns 5
+
+AppTest swaps a process-global runtime on every run, so a single interpreter
+cannot run two scripts at once. The load is therefore split over
+`--processes` worker interpreters started together; each keeps its share of
+the sessions alive at the same time and reruns them round-robin, the way one
+Streamlit server holds many sessions that share its `st.cache_resource`
+objects (the catalog, stores and caches). Each session does a cold run, then
+reruns that change a sidebar selection or type a Tool Dictionary search.
+Reported:
+
+* rss_mb              - resident memory summed over the workers: after one
+                        warm-up session each, after the cold runs, at the end
+* per_session_kb      - RSS growth per live session; includes AppTest's own
+                        copy of each session's element tree
+* session_state_bytes - mean and max of each session's session_state
+* cold_run / rerun    - latency percentiles in milliseconds, all workers pooled
+
+With --catalog-size, a synthetic catalog of that many tools replaces the real one.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_ROOT, BENCH_DIR]
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_worker(sessions, reruns, seed):
+    """Hold `sessions` live AppTest sessions in this process and drive them round-robin."""
+    from streamlit.testing.v1 import AppTest
+
+    from memory import session_memory_report
+    from synthetic import sample_queries
+
+    rng = random.Random(seed)
+    queries = sample_queries()
+
+    def timed_run(at):
+        started = time.perf_counter()
+        at.run()
+        elapsed = (time.perf_counter() - started) * 1000
+        if at.exception:
+            raise RuntimeError(f"toolshed.py failed: {at.exception[0].message}")
+        return elapsed
+
+    def new_session():
+        return AppTest.from_file(os.path.join(REPO_ROOT, "toolshed.py"), default_timeout=600)
+
+    # One warm-up session pays for imports and the shared catalog before measuring
+    timed_run(new_session())
+    rss_start = rss_bytes()
+    apps, cold = [], []
+    for _ in range(sessions):
+        at = new_session()
+        cold.append(timed_run(at))
+        apps.append(at)
+    rss_cold = rss_bytes()
+
+    options = list(apps[0].sidebar.multiselect[0].options)
+    samples = []
+    for round_number in range(reruns):
+        for at in apps:
+            if round_number % 2 == 0:
+                at.sidebar.multiselect[0].set_value(rng.sample(options, k=min(len(options), rng.randint(1, 5))))
+            else:
+                next(box for box in at.text_input if box.label.startswith("🔍 Search tools")).set_value(
+                    rng.choice(queries)
+                )
+            samples.append(timed_run(at))
+    rss_end = rss_bytes()
+
+    return {
+        "sessions": sessions,
+        "rss": [rss_start, rss_cold, rss_end],
+        "session_state_bytes": [session_memory_report(at.session_state.filtered_state)["total"] for at in apps],
+        "cold_run": cold,
+        "rerun": samples,
+    }
+
+
+def run_load_test(sessions, processes, reruns, catalog_size=None):
+    from bench_suite import summarize
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, TOOLSHED_DATA_DIR=directory)
+        if catalog_size:
+            from synthetic import write_synthetic_catalog
+
+            env["TOOLSHED_CATALOG"] = write_synthetic_catalog(os.path.join(directory, "catalog.csv"), catalog_size)
+        shares = [sessions // processes + (i < sessions % processes) for i in range(processes)]
+        workers = []
+        for i, share in enumerate(shares):
+            # No video server starts unless TOOLSHED_VIDEO_URL is set; if it is inherited,
+            # every worker starts its own server, so each still gets its own port
+            worker_env = dict(env, TOOLSHED_VIDEO_PORT=str(18600 + i))
+            workers.append(subprocess.Popen(
+                [sys.executable, __file__, "--worker", str(share), "--reruns", str(reruns), "--seed", str(i)],
+                cwd=REPO_ROOT, env=worker_env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            ))
+        results = []
+        for worker in workers:
+            stdout, stderr = worker.communicate()
+            if worker.returncode != 0:
+                raise RuntimeError(f"load test worker failed:\n{stderr}")
+            results.append(json.loads(stdout.strip().splitlines()[-1]))
+
+    rss = [sum(result["rss"][i] for result in results) for i in range(3)]
+    state_sizes = [size for result in results for size in result["session_state_bytes"]]
+    return {
+        "sessions": sessions,
+        "processes": processes,
+        "reruns_per_session": reruns,
+        "rss_mb": {"start": rss[0] / 1e6, "after_cold_runs": rss[1] / 1e6, "end": rss[2] / 1e6},
+        "per_session_kb": (rss[2] - rss[0]) / sessions / 1e3,
+        "session_state_bytes": {"mean": sum(state_sizes) / len(state_sizes), "max": max(state_sizes)},
+        "cold_run": summarize([ms for result in results for ms in result["cold_run"]]),
+        "rerun": summarize([ms for result in results for ms in result["rerun"]]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--catalog-size", type=int, default=None)
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker, args.reruns, args.seed)))
+        return 0
+
+    report = run_load_test(args.sessions, args.processes, args.reruns, args.catalog_size)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Cold-start benchmark: module import time and first render of toolshed.py.
+
+Each sample runs in a fresh interpreter so nothing is already imported.
+
+    python benchmarks/bench_startup.py --repeat 5 --max-import-ms 1500 --max-first-render-ms 4000
+
+Exits non-zero when a threshold is exceeded or an export library (fpdf,
+xlsxwriter) is imported before an export is requested.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that should only load once an export is requested
+DEFERRED_MODULES = ["fpdf", "xlsxwriter"]
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import streamlit, catalog, exports
+t1 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("toolshed.py", default_timeout=120)
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+at.run()
+t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "first_render_ms": (t3 - t2) * 1000,
+    "second_render_ms": (t4 - t3) * 1000,
+    "errors": [str(e.message) for e in at.exception],
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def run_probe():
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE % DEFERRED_MODULES],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-first-render-ms", type=float, default=None)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    samples = [run_probe() for _ in range(args.repeat)]
+    summary = {
+        key: statistics.median(s[key] for s in samples)
+        for key in ("import_ms", "first_render_ms", "second_render_ms")
+    }
+    summary["eagerly_loaded"] = sorted({m for s in samples for m in s["loaded"]})
+    summary["errors"] = sorted({e for s in samples for e in s["errors"]})
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"import          {summary['import_ms']:8.1f} ms (median of {args.repeat})")
+        print(f"first render    {summary['first_render_ms']:8.1f} ms")
+        print(f"second render   {summary['second_render_ms']:8.1f} ms")
+        print(f"eagerly loaded  {', '.join(summary['eagerly_loaded']) or '-'}")
+
+    failures = list(summary["errors"])
+    if summary["eagerly_loaded"]:
+        failures.append(f"export libraries imported at startup: {summary['eagerly_loaded']}")
+    if args.max_import_ms is not None and summary["import_ms"] > args.max_import_ms:
+        failures.append(f"import {summary['import_ms']:.1f} ms > {args.max_import_ms} ms")
+    if args.max_first_render_ms is not None and summary["first_render_ms"] > args.max_first_render_ms:
+        failures.append(f"first render {summary['first_render_ms']:.1f} ms > {args.max_first_render_ms} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
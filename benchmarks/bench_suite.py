@@ -0,0 +1,173 @@
+"""Rerun, search and export benchmarks for toolshed.py on synthetic catalogs.
+
+    python benchmarks/bench_suite.py --sizes 40,1000,10000,100000 --out bench-results.json
+
+Each catalog size runs in its own interpreter with TOOLSHED_CATALOG and
+TOOLSHED_DATA_DIR pointing at a temporary directory. The app is driven
+headlessly with Streamlit's AppTest. Measured per size:
+
+* app_cold_run / app_rerun     - first script run, then full reruns with no changes
+* app_sidebar_select           - rerun after changing a sidebar multiselect
+* app_search                   - rerun after typing a Tool Dictionary query
+* catalog_load                 - CSV parse + CatalogIndex build
+* sidebar_options              - fetching the four phase option lists
+* search                       - SearchIndex.search over sample queries
+* plan_table                   - build_plan_rows + plan_dataframe for 20 tools
+* export_<format>              - rendering each export for that plan
+
+Timings are in milliseconds; results are written as JSON so runs can be diffed.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_ROOT, BENCH_DIR]
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "p50": pct(50),
+        "p90": pct(90),
+        "p99": pct(99),
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def run_worker(size, reruns):
+    """Benchmark one catalog size in this process; catalog and data dir come from the environment."""
+    from streamlit.testing.v1 import AppTest
+
+    from catalog import PDCA_PHASES, build_catalog_index, read_catalog
+    from exports import EXPORT_FORMATS, build_plan_rows, plan_dataframe, render_export
+    from synthetic import sample_queries
+
+    results = {"catalog_size": size}
+
+    load_ms, catalog = timed(lambda: build_catalog_index(read_catalog()))
+    results["catalog_load"] = summarize([load_ms])
+
+    results["sidebar_options"] = summarize([
+        timed(lambda: [catalog.phase_options[phase] for phase in PDCA_PHASES])[0] for _ in range(reruns)
+    ])
+
+    queries = sample_queries()
+    results["search"] = summarize([timed(catalog.search.search, query)[0] for query in queries])
+    results["similar_search"] = summarize([timed(catalog.similarity.query, query)[0] for query in queries])
+
+    selected = {phase: list(catalog.phase_options[phase][:5]) for phase in PDCA_PHASES}
+    describe = lambda tool: catalog.descriptions.get(tool, "")  # noqa: E731
+    results["plan_table"] = summarize([
+        timed(lambda: plan_dataframe(build_plan_rows(selected, describe)))[0] for _ in range(reruns)
+    ])
+    plan_df = plan_dataframe(build_plan_rows(selected, describe))
+    for fmt in EXPORT_FORMATS:
+        results[f"export_{fmt}"] = summarize([
+            timed(render_export, fmt, plan_df, "Benchmark", "Owner", "01-01-2026")[0] for _ in range(reruns)
+        ])
+
+    # --- full app, driven headlessly ---
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "toolshed.py"), default_timeout=600)
+    cold_ms, _ = timed(at.run)
+    if at.exception:
+        raise RuntimeError(f"toolshed.py failed: {at.exception[0].message}")
+    results["app_cold_run"] = summarize([cold_ms])
+    results["app_rerun"] = summarize([timed(at.run)[0] for _ in range(reruns)])
+
+    samples = []
+    for i in range(reruns):
+        options = list(catalog.phase_options["Plan"][: (i % 5) + 1])
+        at.sidebar.multiselect[0].set_value(options)
+        samples.append(timed(at.run)[0])
+    results["app_sidebar_select"] = summarize(samples)
+
+    samples = []
+    for query in queries[:reruns]:
+        search_box = next(box for box in at.text_input if box.label.startswith("🔍"))
+        search_box.set_value(query)
+        samples.append(timed(at.run)[0])
+    results["app_search"] = summarize(samples)
+    return results
+
+
+def run_size(size, reruns):
+    from synthetic import write_synthetic_catalog
+
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = write_synthetic_catalog(os.path.join(directory, "catalog.csv"), size)
+        env = dict(os.environ, TOOLSHED_CATALOG=catalog_path, TOOLSHED_DATA_DIR=directory)
+        completed = subprocess.run(
+            [sys.executable, __file__, "--worker", str(size), "--reruns", str(reruns)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"benchmark for {size} tools failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="40,1000,10000,100000")
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--out", default=None, help="write JSON results here (default: stdout)")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(run_worker(args.worker, args.reruns)))
+        return 0
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "reruns": args.reruns,
+            "unit": "ms",
+        },
+        "results": [],
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"benchmarking {size} tools...", file=sys.stderr)
+        report["results"].append(run_size(size, args.reruns))
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out_file:
+            out_file.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
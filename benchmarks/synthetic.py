@@ -0,0 +1,54 @@
+"""Synthetic catalogs shaped like Data/Tools_description.csv."""
+import random
+
+import pandas as pd
+
+from catalog import PDCA_PHASES
+
+_WORDS = (
+    "root cause analysis process flow value stream waste defect quality control chart "
+    "map team problem solving improvement kaizen standard work visual board audit "
+    "pareto histogram scatter check sheet risk priority plan action measure data "
+    "customer voice capability sigma lean cycle time bottleneck capacity survey"
+).split()
+
+
+def synthetic_catalog(size, seed=0, link_ratio=0.1):
+    """A raw catalog frame (CSV column names) with `size` uniquely named tools."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        name = f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} {i}"
+        rows.append({
+            "Tool Name": name,
+            "PDCA Category": PDCA_PHASES[i % 4],
+            "Description": " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + ".",
+            "Unnamed: 3": f"https://example.com/tools/{i}" if rng.random() < link_ratio else None,
+            "Unnamed: 4": None,
+            "Unnamed: 5": None,
+            "Unnamed: 6": None,
+            "Usage Count": 0,
+            "Last Used": None,
+            "Project Count": 0,
+        })
+    return pd.DataFrame(rows)
+
+
+def write_synthetic_catalog(path, size, seed=0):
+    synthetic_catalog(size, seed=seed).to_csv(path, index=False)
+    return path
+
+
+def sample_queries(count=50, seed=1):
+    """Search queries mixing single words, prefixes and two-term AND queries."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(rng.choice(_WORDS))
+        elif kind < 0.7:
+            queries.append(rng.choice(_WORDS)[:3])
+        else:
+            queries.append(f"{rng.choice(_WORDS)} {rng.choice(_WORDS)}")
+    return queries
@@ -0,0 +1,301 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from search import SearchIndex
+from selection import SelectionCodec, register_codec
+from similarity import load_or_build
+
+PDCA_PHASES = ["Plan", "Do", "Check", "Act"]
+
+# ✅ The CSV exports its link/video columns without headers
+COLUMN_RENAMES = {
+    "Unnamed: 3": "More Info",
+    "Unnamed: 4": "Video1",
+    "Unnamed: 5": "Video2",
+    "Unnamed: 6": "Video3"
+}
+
+# Immutable lookups built once per catalog version and shared by every session
+# without copies (mappings are read-only proxies, sequences are tuples):
+#   frame         - the catalog with fixed column names
+#   phase_options - PDCA phase -> tuple of tool names, in catalog order
+#   all_tools     - every tool name, phase by phase, for tagging widgets
+#   selections    - bitset codec for tool selections over the `all_tools` slots
+#   tool_rows     - tool name -> row position in `frame` (first occurrence wins)
+#   descriptions  - tool name -> description text
+#   search        - inverted index over names and descriptions
+#   similarity    - TF-IDF vectors over names and descriptions (SimilarityIndex)
+#   display       - the Tool Dictionary table (Phase, linked Tool Name, Description)
+#   version       - content hash of the source file, or None
+CatalogIndex = namedtuple(
+    "CatalogIndex",
+    ["frame", "phase_options", "all_tools", "selections", "tool_rows", "descriptions", "search", "similarity",
+     "display", "version"],
+)
+
+# Mostly-empty columns kept as sparse arrays
+LINK_COLUMNS = ["More Info", "Video1", "Video2", "Video3"]
+TEXT_COLUMNS = ["Tool Name", "Description"]
+COUNT_COLUMNS = ["Usage Count", "Project Count"]
+
+# Overridable so benchmarks and deployments can point at another catalog (.csv or compiled .arrow)
+CATALOG_PATH = os.environ.get("TOOLSHED_CATALOG", "Data/Tools_description.csv")
+CATALOG_FALLBACK = "Tools_description.csv"
+
+# ✅ Compiled by catalog_import.py from one or more department catalogs. It is served
+# instead of the default catalog while it is at least as new as the CSV, so editing the
+# CSV takes over again until the next import. Catalog paths passed explicitly are read
+# as given; an explicit TOOLSHED_CATALOG turns it off unless TOOLSHED_CATALOG_ARTIFACT is set too.
+ARTIFACT_SUFFIX = ".arrow"
+CATALOG_ARTIFACT = os.environ.get(
+    "TOOLSHED_CATALOG_ARTIFACT", None if "TOOLSHED_CATALOG" in os.environ else "Data/catalog.arrow"
+)
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_catalog_path(path=None, fallback=CATALOG_FALLBACK, artifact=CATALOG_ARTIFACT):
+    """The file to read: `path` if given, else the artifact or CATALOG_PATH, whichever is newer."""
+    source = path or CATALOG_PATH
+    source = source if os.path.exists(source) else fallback
+    if path is None and artifact and os.path.exists(artifact) and _has_pyarrow():
+        if not os.path.exists(source) or os.path.getmtime(artifact) >= os.path.getmtime(source):
+            return artifact
+    return source
+
+
+def read_catalog_artifact(path):
+    """(raw frame, sha256) of a compiled catalog.
+
+    The file is memory-mapped and its text columns become pyarrow-backed
+    strings over the mapped buffers, so nothing is parsed or copied.
+    """
+    import pyarrow as pa
+
+    mapped = pa.memory_map(path, "r")
+    digest = hashlib.sha256(mapped.read_buffer()).hexdigest()
+    table = pa.ipc.open_file(mapped).read_all()
+    return table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get), digest
+
+
+def read_catalog(path=None, fallback=CATALOG_FALLBACK, artifact=CATALOG_ARTIFACT):
+    source = resolve_catalog_path(path, fallback, artifact)
+    if source.endswith(ARTIFACT_SUFFIX):
+        return read_catalog_artifact(source)[0]
+    return pd.read_csv(source)
+
+
+def _string_dtype():
+    return "string[pyarrow]" if _has_pyarrow() else None
+
+
+def compact_frame(frame):
+    """Shrink the catalog: categorical phase, Arrow (or interned) strings,
+    sparse link/video columns and 32-bit counters."""
+    string_dtype = _string_dtype()
+    columns = {}
+    for column in frame.columns:
+        values = frame[column]
+        if column == "PDCA Category":
+            extra = sorted(set(values.dropna().unique()) - set(PDCA_PHASES))
+            values = values.astype(pd.CategoricalDtype(PDCA_PHASES + extra))
+        elif column in LINK_COLUMNS:
+            values = values.astype(object)
+            empty = values.isna() | values.astype(str).str.strip().eq("")
+            values = values.mask(empty, np.nan).astype(pd.SparseDtype(object, np.nan))
+        elif column in TEXT_COLUMNS:
+            if string_dtype is not None:
+                values = values.astype(string_dtype)
+            else:
+                values = values.map(lambda v: sys.intern(v) if isinstance(v, str) else v)
+        elif column in COUNT_COLUMNS and values.notna().all():
+            values = values.astype("int32")
+        columns[column] = values
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def link_entries(values):
+    """Row positions and values of the non-empty entries in a link/video column."""
+    if isinstance(values.dtype, pd.SparseDtype):
+        array = values.array
+        return array.sp_index.indices, np.asarray(array.sp_values, dtype=object)
+    present = values.notna() & values.astype(str).str.strip().ne("")
+    positions = np.flatnonzero(present.to_numpy())
+    return positions, values.to_numpy(dtype=object)[positions]
+
+
+def tool_descriptions(frame):
+    """Tool name -> description (first occurrence wins), without building a full CatalogIndex."""
+    names = frame["Tool Name"]
+    first = ~names.duplicated()
+    return dict(zip(names[first].tolist(), frame["Description"].fillna("")[first].tolist()))
+
+
+def similar_tool_names(index, rows, k=3):
+    """Comma-separated names of the nearest tools of each catalog row in `rows`, skipping its own name.
+
+    Neighbours come from one similarity query for all `rows`, so callers pass
+    only the rows they show."""
+    names = index.frame["Tool Name"]
+    similar = []
+    for row, neighbors in zip(rows, index.similarity.similar_many(rows, k=k + 2)):
+        others = dict.fromkeys(names.iat[other] for other, _ in neighbors)
+        others.pop(names.iat[row], None)
+        similar.append(", ".join(list(others)[:k]))
+    return similar
+
+
+def build_display_frame(frame):
+    """Tool Dictionary table with each Tool Name wrapped in its More Info link.
+
+    Anchors are built with vectorized string ops over the linked rows only."""
+    tool_names = frame["Tool Name"]
+    if "More Info" in frame.columns:
+        positions, links = link_entries(frame["More Info"])
+        if len(positions):
+            linked = tool_names.to_numpy(dtype=object, copy=True)
+            anchors = (
+                "<a href='" + pd.Series(links, dtype=object).astype(str) + "' target='_blank'>"
+                + pd.Series(linked[positions], dtype=object).astype(str) + "</a>"
+            )
+            linked[positions] = anchors.to_numpy()
+            tool_names = pd.Series(linked, index=frame.index).astype(tool_names.dtype)
+
+    return pd.DataFrame({
+        "Phase": frame["PDCA Category"],
+        "Tool Name": tool_names,
+        "Description": frame["Description"],
+    })
+
+
+def build_catalog_index(raw, version=None, similarity_dir=None):
+    frame = compact_frame(raw.rename(columns=COLUMN_RENAMES))
+
+    names = frame["Tool Name"].tolist()
+    phases = frame["PDCA Category"].tolist()
+    descriptions_col = frame["Description"].fillna("").tolist()
+
+    phase_options = {phase: [] for phase in PDCA_PHASES}
+    tool_rows = {}
+    descriptions = {}
+    for position, (name, phase, description) in enumerate(zip(names, phases, descriptions_col)):
+        if phase in phase_options:
+            phase_options[phase].append(name)
+        if name not in tool_rows:
+            tool_rows[name] = position
+            descriptions[name] = description
+
+    similarity = load_or_build(names, descriptions_col, version, similarity_dir)
+    phase_options = MappingProxyType({phase: tuple(options) for phase, options in phase_options.items()})
+    selections = SelectionCodec(phase_options, version)
+    if version is not None:
+        register_codec(selections)
+    return CatalogIndex(
+        frame=frame,
+        phase_options=phase_options,
+        all_tools=selections.slots,
+        selections=selections,
+        tool_rows=MappingProxyType(tool_rows),
+        descriptions=MappingProxyType(descriptions),
+        search=SearchIndex(names, descriptions_col),
+        similarity=similarity,
+        display=build_display_frame(frame),
+        version=version,
+    )
+
+
+class CatalogLoader:
+    """Serves the current CatalogIndex and reloads it when the source file changes.
+
+    `snapshot()` returns an immutable index; callers hold on to it for the rest
+    of their rerun. At most every `check_interval` seconds it stats the file, and
+    a changed mtime/size starts a background reload. The new index replaces the
+    old one in a single reference assignment, and only if the content hash
+    differs, so a touched but unchanged file is not rebuilt.
+    """
+
+    def __init__(self, path=None, fallback=CATALOG_FALLBACK, check_interval=2.0, build=build_catalog_index,
+                 artifact=CATALOG_ARTIFACT):
+        self.path = path
+        self.fallback = fallback
+        self.artifact = artifact
+        self.check_interval = check_interval
+        self._build = build
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._last_check = 0.0
+        self.last_error = None
+        self._stat, self._current = self._load()
+
+    def _stat_key(self):
+        stat = os.stat(resolve_catalog_path(self.path, self.fallback, self.artifact))
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        source = resolve_catalog_path(self.path, self.fallback, self.artifact)
+        stat_key = self._stat_key()
+        if source.endswith(ARTIFACT_SUFFIX):
+            raw, digest = read_catalog_artifact(source)
+        else:
+            with open(source, "rb") as catalog_file:
+                data = catalog_file.read()
+            digest = hashlib.sha256(data).hexdigest()
+            raw = None
+        current = getattr(self, "_current", None)
+        if current is not None and current.version == digest:
+            return stat_key, current
+        if raw is None:
+            raw = pd.read_csv(io.BytesIO(data))
+        # TF-IDF vectors are saved next to the catalog so a restart does not recompute them
+        similarity_dir = os.path.join(os.path.dirname(os.path.abspath(source)), "similarity")
+        return stat_key, self._build(raw, version=digest, similarity_dir=similarity_dir)
+
+    def _reload(self):
+        try:
+            stat_key, index = self._load()
+            self._stat, self._current = stat_key, index
+            self.last_error = None
+        except Exception as error:  # Keep serving the previous snapshot
+            self.last_error = error
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def snapshot(self):
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            try:
+                changed = self._stat_key() != self._stat
+            except OSError:
+                changed = False
+            if changed:
+                with self._lock:
+                    start = not self._reloading
+                    self._reloading = True
+                if start:
+                    threading.Thread(target=self._reload, name="catalog-reload", daemon=True).start()
+        return self._current
+
+    def wait_for_reload(self, timeout=10.0):
+        """Block until any in-flight reload finishes; returns the current index."""
+        deadline = time.monotonic() + timeout
+        while self._reloading and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self._current
+
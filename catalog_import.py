@@ -0,0 +1,224 @@
+"""Compile department tool catalogs into the one catalog artifact the app serves.
+
+    python catalog_import.py Data/Tools_description.csv quality.xlsx ops.csv --out Data/catalog.arrow
+
+Sources (CSV or XLSX) are streamed in chunks of --chunk-size rows: pandas
+reads CSV chunks, openpyxl reads XLSX rows in read-only mode. Each chunk is
+validated and written straight to the artifact, so memory stays flat however
+large the spreadsheets are:
+
+* Tool Name must be present; PDCA Category must be Plan, Do, Check or Act
+  (any case). Other rows are rejected.
+* More Info and Video1-Video3 must be http(s) URLs; anything else is cleared.
+* Tools are deduplicated by name, ignoring case and spacing; the first
+  source listed wins.
+
+Rejected rows and cleared fields are listed in --report (CSV). The artifact
+is an uncompressed Arrow IPC file written to a temporary name and renamed into
+place; a running app picks it up on its next catalog check and memory-maps it
+instead of parsing CSV. Needs pyarrow (and openpyxl for XLSX sources).
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from catalog import CATALOG_ARTIFACT, COLUMN_RENAMES, LINK_COLUMNS, PDCA_PHASES
+
+CATALOG_COLUMNS = [
+    "Tool Name", "PDCA Category", "Description", "More Info", "Video1", "Video2", "Video3",
+    "Usage Count", "Last Used", "Project Count",
+]
+INT_COLUMNS = ["Usage Count", "Project Count"]
+CHUNK_SIZE = 50000
+
+_PHASES = {phase.lower(): phase for phase in PDCA_PHASES}
+_CANONICAL = {column.lower(): column for column in CATALOG_COLUMNS}
+
+REPORT_COLUMNS = ["Source", "Line", "Tool Name", "Problem"]
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        (column, pa.int32() if column in INT_COLUMNS else pa.string()) for column in CATALOG_COLUMNS
+    ])
+
+
+def canonical_columns(header):
+    """Source header -> catalog column names; unknown columns map to None."""
+    columns = []
+    for name in header:
+        name = COLUMN_RENAMES.get(str(name), str(name) if name is not None else "")
+        columns.append(_CANONICAL.get(" ".join(name.split()).lower()))
+    return columns
+
+
+def read_csv_chunks(path, chunk_size=CHUNK_SIZE):
+    """(first line number, frame of strings) per chunk; missing cells are ""."""
+    line = 2
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+        yield line, chunk
+        line += len(chunk)
+
+
+def read_xlsx_chunks(path, chunk_size=CHUNK_SIZE, sheet=None):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = (workbook[sheet] if sheet else workbook.active).iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        width = len(header)
+        line = 2
+        batch = []
+        for row in rows:
+            values = ["" if value is None else str(value) for value in row[:width]]
+            batch.append(values + [""] * (width - len(values)))
+            if len(batch) == chunk_size:
+                yield line, pd.DataFrame(batch, columns=header)
+                line += len(batch)
+                batch = []
+        if batch:
+            yield line, pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        return read_xlsx_chunks(path, chunk_size)
+    return read_csv_chunks(path, chunk_size)
+
+
+def valid_url(value):
+    parsed = urlparse(value)
+    return parsed.scheme in ("http", "https") and bool(parsed.netloc)
+
+
+def name_key(name):
+    return " ".join(name.casefold().split())
+
+
+def clean_chunk(chunk, source, first_line, seen):
+    """Validate one chunk; returns (catalog frame, [report rows]). `seen` holds name keys of kept tools."""
+    columns = canonical_columns(chunk.columns)
+    chunk = chunk.set_axis(range(len(chunk.columns)), axis=1)
+    frame = pd.DataFrame(index=chunk.index)
+    for position, column in enumerate(columns):
+        if column is not None and column not in frame.columns:
+            frame[column] = chunk[position].astype(str).str.strip()
+    for column in CATALOG_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = ""
+
+    lines = first_line + pd.RangeIndex(len(frame))
+    report = []
+    keep = pd.Series(True, index=frame.index)
+
+    missing_name = frame["Tool Name"].eq("")
+    for line in lines[missing_name.to_numpy()]:
+        report.append([source, line, "", "missing Tool Name"])
+    keep &= ~missing_name
+
+    phases = frame["PDCA Category"].str.lower().map(_PHASES)
+    bad_phase = keep & phases.isna()
+    for line, name, phase in zip(lines[bad_phase.to_numpy()], frame["Tool Name"][bad_phase],
+                                 frame["PDCA Category"][bad_phase]):
+        report.append([source, line, name, f"invalid PDCA Category {phase!r}"])
+    keep &= ~bad_phase
+    frame["PDCA Category"] = phases
+
+    for column in LINK_COLUMNS:
+        values = frame[column]
+        bad_url = keep & values.ne("") & ~values.map(valid_url)
+        for line, name, value in zip(lines[bad_url.to_numpy()], frame["Tool Name"][bad_url], values[bad_url]):
+            report.append([source, line, name, f"cleared invalid URL in {column}: {value!r}"])
+        frame[column] = values.mask(bad_url | values.eq(""))
+
+    # First occurrence of a name wins, across chunks and sources
+    duplicate = pd.Series(False, index=frame.index)
+    for row, name in frame["Tool Name"][keep].items():
+        key = name_key(name)
+        if key in seen:
+            duplicate[row] = True
+        else:
+            seen.add(key)
+    for line, name in zip(lines[duplicate.to_numpy()], frame["Tool Name"][duplicate]):
+        report.append([source, line, name, "duplicate Tool Name, kept the first one"])
+    keep &= ~duplicate
+
+    frame = frame[keep]
+    for column in INT_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").fillna(0).clip(lower=0).astype("int32")
+    for column in ("Description", "Last Used"):
+        frame[column] = frame[column].mask(frame[column].eq(""))
+    report.sort(key=lambda problem: problem[1])
+    return frame[CATALOG_COLUMNS], report
+
+
+def compile_catalog(sources, out=CATALOG_ARTIFACT, report_path=None, chunk_size=CHUNK_SIZE):
+    """Stream `sources` into the artifact at `out`; returns a summary dict."""
+    import pyarrow as pa
+
+    schema = _schema()
+    seen = set()
+    summary = {"sources": {}, "tools": 0, "problems": 0}
+    directory = os.path.dirname(os.path.abspath(out))
+    os.makedirs(directory, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix=".part")
+    os.close(fd)
+    report_file = open(report_path, "w", newline="", encoding="utf-8") if report_path else None
+    try:
+        report = csv.writer(report_file) if report_file else None
+        if report:
+            report.writerow(REPORT_COLUMNS)
+        with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for source in sources:
+                rows = kept = 0
+                for first_line, chunk in read_chunks(source, chunk_size):
+                    frame, problems = clean_chunk(chunk, source, first_line, seen)
+                    rows += len(chunk)
+                    kept += len(frame)
+                    summary["problems"] += len(problems)
+                    if report:
+                        report.writerows(problems)
+                    if len(frame):
+                        writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                summary["sources"][source] = {"rows": rows, "kept": kept}
+                summary["tools"] += kept
+        os.replace(temporary, out)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    finally:
+        if report_file:
+            report_file.close()
+    summary["artifact"] = out
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="CSV or XLSX catalogs, highest priority first")
+    parser.add_argument("--out", default=CATALOG_ARTIFACT or "Data/catalog.arrow")
+    parser.add_argument("--report", default=None, help="CSV file listing rejected rows and cleared fields")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    summary = compile_catalog(args.sources, args.out, args.report, args.chunk_size)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
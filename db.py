@@ -0,0 +1,88 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Local SQLite stores live here; overridable for benchmarks and tests
+DATA_DIR = os.environ.get("TOOLSHED_DATA_DIR", "Data")
+APP_DB_PATH = os.path.join(DATA_DIR, "toolshed.db")
+
+
+def _open(path):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by every session in the process.
+
+    Connections are opened lazily up to `size`; once all are checked out,
+    `connection()` waits for one to be returned. WAL mode lets readers run
+    alongside the single writer.
+    """
+
+    def __init__(self, path=APP_DB_PATH, size=8, timeout=30):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return _open(self.path)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free connection to {self.path} after {self.timeout}s") from None
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; the block runs as one transaction, committed on success."""
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def executescript(self, script):
+        with self.connection() as conn:
+            conn.executescript(script)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=APP_DB_PATH, size=8):
+    """One pool per database file for the whole process."""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path, size=size)
+        return pool
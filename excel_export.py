@@ -0,0 +1,77 @@
+"""Streaming Excel writer for Project Plans.
+
+Rows go straight from the plan into xlsxwriter's constant_memory mode. Each
+row is flushed to a temporary file as soon as the next one starts, so memory
+stays flat however many tasks a plan has, and no DataFrame is built on the way.
+"""
+import io
+
+HEADER = ["PDCA Phase", "Task Name", "Description"]
+COLUMN_WIDTHS = [12, 32, 90]
+
+# ✅ Same palette as the Toolshed tab's toolboxes
+PHASE_COLORS = {
+    "Plan": "#FFD700",
+    "Do": "#32CD32",
+    "Check": "#1E90FF",
+    "Act": "#FF4500",
+}
+
+
+def _text(value):
+    return value if isinstance(value, str) else ""
+
+
+def _start_sheet(workbook, name, header_format, phase_column=True):
+    sheet = workbook.add_worksheet(name)
+    header = HEADER if phase_column else HEADER[1:]
+    widths = COLUMN_WIDTHS if phase_column else COLUMN_WIDTHS[1:]
+    for column, width in enumerate(widths):
+        sheet.set_column(column, column, width)
+    sheet.freeze_panes(1, 0)
+    sheet.write_row(0, 0, header, header_format)
+    return sheet
+
+
+def write_plan_xlsx(rows, out, phase_sheets=False):
+    """Write (phase, task name, description) rows to `out` (a path or binary file object).
+
+    With `phase_sheets`, each PDCA phase also gets its own sheet, headed in the
+    phase colour, next to the combined "Project Plan" sheet.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(out, {"constant_memory": True})
+    header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    wrap_format = workbook.add_format({"text_wrap": True, "valign": "top"})
+
+    plan_sheet = _start_sheet(workbook, "Project Plan", header_format)
+    phase_rows = {}
+    sheets = {}
+    if phase_sheets:
+        for phase, color in PHASE_COLORS.items():
+            phase_header = workbook.add_format({"bold": True, "border": 1, "bg_color": color, "font_color": "white"})
+            sheets[phase] = _start_sheet(workbook, phase, phase_header, phase_column=False)
+            phase_rows[phase] = 0
+
+    row_number = 0
+    for phase, task_name, description in rows:
+        row_number += 1
+        plan_sheet.write_string(row_number, 0, _text(phase))
+        plan_sheet.write_string(row_number, 1, _text(task_name))
+        plan_sheet.write_string(row_number, 2, _text(description), wrap_format)
+        sheet = sheets.get(phase)
+        if sheet is not None:
+            phase_rows[phase] += 1
+            sheet.write_string(phase_rows[phase], 0, _text(task_name))
+            sheet.write_string(phase_rows[phase], 1, _text(description), wrap_format)
+
+    plan_sheet.autofilter(0, 0, row_number, len(HEADER) - 1)
+    workbook.close()
+    return row_number
+
+
+def render_plan_xlsx(rows, phase_sheets=False):
+    buffer = io.BytesIO()
+    write_plan_xlsx(rows, buffer, phase_sheets=phase_sheets)
+    return buffer.getvalue()
@@ -0,0 +1,195 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from catalog import PDCA_PHASES
+
+# ✅ Format -> (button label, file name, mime type)
+EXPORT_FORMATS = {
+    "csv": ("Download CSV", "Project_Plan.csv", "text/csv"),
+    "excel": ("Download Excel", "Project_Plan.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "txt": ("Download TXT", "Project_Plan.txt", "text/plain"),
+    "pdf": ("Download PDF", "Project_Plan.pdf", "application/pdf"),
+}
+
+
+def plan_hash(project_name, project_owner, created_date, selected_tools, catalog_version=None):
+    """Stable content hash of a project plan.
+
+    With the catalog version it is the export cache key: exports include tool
+    descriptions, so a reloaded catalog must not serve files rendered from the old one.
+    """
+    payload = {
+        "name": project_name,
+        "owner": project_owner,
+        "created": created_date,
+        "tools": {phase: list(selected_tools.get(phase, [])) for phase in PDCA_PHASES},
+    }
+    if catalog_version is not None:
+        payload["catalog"] = catalog_version
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def build_plan_rows(selected_tools, describe):
+    """Turn the per-phase selections into task rows; `describe` maps a tool name to its description."""
+    rows = []
+    for phase in PDCA_PHASES:
+        for tool in selected_tools.get(phase, []):
+            rows.append({"PDCA Phase": phase, "Task Name": tool, "Description": describe(tool)})
+    return rows
+
+
+def plan_dataframe(rows):
+    return pd.DataFrame(rows)
+
+
+def render_csv(plan_df):
+    return plan_df.to_csv(index=False, encoding='utf-8-sig')
+
+
+def render_txt(plan_df):
+    return plan_df.to_csv(index=False, sep='\t')
+
+
+def plan_rows(plan_df):
+    """(phase, task name, description) tuples straight from the plan, without copying the frame."""
+    if plan_df.empty:
+        return []
+    return plan_df[["PDCA Phase", "Task Name", "Description"]].itertuples(index=False, name=None)
+
+
+def render_excel(plan_df, phase_sheets=False):
+    """Render the plan with the streaming (constant_memory) xlsxwriter path."""
+    from excel_export import render_plan_xlsx
+
+    return render_plan_xlsx(plan_rows(plan_df), phase_sheets=phase_sheets)
+
+
+def render_excel_pandas(plan_df):
+    """The original pd.ExcelWriter export, kept as the baseline for benchmarks/bench_excel.py."""
+    excel_output = io.BytesIO()
+    with pd.ExcelWriter(excel_output, engine='xlsxwriter') as writer:
+        plan_df.to_excel(writer, index=False, sheet_name="Project Plan")
+    return excel_output.getvalue()
+
+
+def _clean_text(text):
+    return ''.join(c for c in text if ord(c) < 128)  # Keep only ASCII characters
+
+
+def _latin1(text):
+    # FPDF core fonts are latin-1 only; replace anything else instead of failing
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def render_pdf(plan_df, project_name, project_owner, created_date):
+    """Render the plan with the streaming writer. Raises ImportError if FPDF (font metrics) is not installed."""
+    from pdf_export import render_plan_pdf
+
+    return render_plan_pdf(plan_df, project_name, project_owner, created_date)
+
+
+def render_pdf_fpdf(plan_df, project_name, project_owner, created_date):
+    """The original FPDF loop, kept as the baseline for benchmarks/bench_pdf.py."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    # ✅ Title Section
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, _latin1(f"Project Plan - {project_name}"), ln=1, align='C')
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 10, _latin1(f"Owner: {project_owner}    Created: {created_date}"), ln=1, align='C')
+    pdf.ln(10)
+
+    # ✅ Write tasks to PDF
+    if not plan_df.empty:
+        for _, row in plan_df.iterrows():
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 8, f"{row['PDCA Phase']} Phase", ln=1)
+            pdf.set_font("Arial", '', 12)
+
+            # ✅ Handle encoding issues
+            task_name = _clean_text(row['Task Name'] if row['Task Name'] else "Unnamed Task")
+            description = _clean_text(row['Description'] if row['Description'] else "No Description Available")
+
+            pdf.cell(0, 6, f"{task_name} - {description}", ln=1)
+            pdf.cell(0, 6, "Start Date: ______    Completion Date: ______", ln=1)
+            pdf.ln(4)
+    else:
+        pdf.set_font("Arial", 'I', 12)
+        pdf.cell(0, 10, "No tasks selected for this project plan.", ln=1, align='C')
+
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def render_export(fmt, plan_df, project_name, project_owner, created_date):
+    if fmt == "csv":
+        return render_csv(plan_df)
+    if fmt == "txt":
+        return render_txt(plan_df)
+    if fmt == "excel":
+        return render_excel(plan_df)
+    if fmt == "pdf":
+        return render_pdf(plan_df, project_name, project_owner, created_date)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def export_bytes(data):
+    """The bytes a download button serves for `data` (str is sent UTF-8 encoded)."""
+    return data.encode() if isinstance(data, str) else data
+
+
+class ExportCache:
+    """Thread-safe LRU of rendered export bytes, capped by entry count and total size."""
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        size = len(data)
+        if size > self.max_bytes:
+            return  # Never cache a single export bigger than the whole cache
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key, render):
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,167 @@
+import atexit
+import csv
+import hashlib
+import io
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from db import get_pool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    author TEXT NOT NULL,
+    project TEXT NOT NULL,
+    body TEXT NOT NULL,
+    digest TEXT NOT NULL UNIQUE
+);
+CREATE INDEX IF NOT EXISTS feedback_ts ON feedback (ts);
+"""
+
+# Submission outcomes
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+BUSY = "busy"
+EMPTY = "empty"
+
+EXPORT_COLUMNS = ["Submitted", "Author", "Project", "Feedback"]
+
+
+def feedback_digest(author, body):
+    """Same author and same text (ignoring case and spacing) is the same submission."""
+    normalized = " ".join(body.lower().split())
+    return hashlib.sha256(f"{author.strip().lower()}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class FeedbackQueue:
+    """Feedback submissions, written to SQLite in batches by a background thread.
+
+    `submit()` never blocks a rerun. Double-submits are caught in memory
+    against recent digests (and by the UNIQUE digest column after that).
+    When `max_pending` submissions are already waiting, the new one is
+    refused with BUSY so the caller can ask the user to retry; nothing is
+    dropped silently.
+    """
+
+    def __init__(self, pool=None, batch_size=200, flush_interval=0.5, max_pending=1000, recent=10000):
+        self.pool = pool or get_pool()
+        self.pool.executescript(_SCHEMA)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._recent = OrderedDict()
+        self._recent_size = recent
+        self._recent_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _seen(self, digest):
+        """Remember `digest`; True if it was already among the recent submissions."""
+        with self._recent_lock:
+            if digest in self._recent:
+                self._recent.move_to_end(digest)
+                return True
+            self._recent[digest] = None
+            if len(self._recent) > self._recent_size:
+                self._recent.popitem(last=False)
+            return False
+
+    def _forget(self, digest):
+        with self._recent_lock:
+            self._recent.pop(digest, None)
+
+    def submit(self, body, author="", project=""):
+        """Queue one piece of feedback; returns ACCEPTED, DUPLICATE, BUSY or EMPTY."""
+        body = body.strip()
+        if not body:
+            return EMPTY
+        digest = feedback_digest(author, body)
+        if self._seen(digest):
+            return DUPLICATE
+        try:
+            self._queue.put_nowait((time.time(), author.strip(), project.strip(), body, digest))
+        except queue.Full:
+            self._forget(digest)
+            self.rejected += 1
+            return BUSY
+        return ACCEPTED
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _drain(self, first):
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = self._drain(first)
+            try:
+                with self.pool.connection() as conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO feedback (ts, author, project, body, digest) VALUES (?, ?, ?, ?, ?)",
+                        batch,
+                    )
+                self.written += len(batch)
+            except sqlite3.Error:
+                self.failed += len(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far has been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+
+    def count(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+
+    def rows(self, since=None):
+        """Stored feedback, oldest first, as (ts, author, project, body); streamed from the cursor."""
+        with self.pool.connection() as conn:
+            yield from conn.execute(
+                "SELECT ts, author, project, body FROM feedback WHERE ts >= ? ORDER BY ts, id", (since or 0,)
+            )
+
+    def write_csv(self, out, since=None):
+        """Write stored feedback to a text file object; returns the number of rows."""
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_COLUMNS)
+        count = 0
+        for ts, author, project, body in self.rows(since):
+            writer.writerow([datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"), author, project, body])
+            count += 1
+        return count
+
+    def export_csv(self, since=None):
+        buffer = io.StringIO()
+        self.write_csv(buffer, since)
+        return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,224 @@
+import re
+import time
+
+from db import get_pool
+from search import MIN_PREFIX_LEN
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forum_threads (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_post REAL NOT NULL,
+    reply_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS forum_threads_last_post ON forum_threads (last_post, id);
+CREATE TABLE IF NOT EXISTS forum_posts (
+    id INTEGER PRIMARY KEY,
+    thread_id INTEGER NOT NULL REFERENCES forum_threads (id) ON DELETE CASCADE,
+    author TEXT NOT NULL,
+    title TEXT,
+    body TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS forum_posts_thread ON forum_posts (thread_id, id);
+CREATE TABLE IF NOT EXISTS forum_thread_tools (
+    tool TEXT NOT NULL,
+    last_post REAL NOT NULL,
+    thread_id INTEGER NOT NULL REFERENCES forum_threads (id) ON DELETE CASCADE,
+    PRIMARY KEY (tool, last_post, thread_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS forum_thread_tools_thread ON forum_thread_tools (thread_id);
+CREATE TABLE IF NOT EXISTS forum_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS forum_fts USING fts5(
+    title, body, content='forum_posts', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS forum_posts_ai AFTER INSERT ON forum_posts BEGIN
+    INSERT INTO forum_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS forum_posts_ad AFTER DELETE ON forum_posts BEGIN
+    INSERT INTO forum_fts (forum_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+"""
+
+# Runs of Unicode letters and digits, as FTS5's unicode61 tokenizer splits them
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def match_terms(query):
+    """Lowercased words of free text, non-ASCII letters included ("Größe" -> ["größe"])."""
+    if not isinstance(query, str):
+        return []
+    return _WORD_RE.findall(query.lower())
+
+
+def match_expression(query):
+    """FTS5 MATCH string for free text: every word must match, the last one as a prefix
+    once it is long enough to be selective (as in the Tool Dictionary search).
+
+    Words are quoted, so FTS5 operators typed by users are treated as text.
+    """
+    terms = match_terms(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    if len(terms[-1]) >= MIN_PREFIX_LEN:
+        quoted[-1] += "*"
+    return " AND ".join(quoted)
+
+
+class ForumStore:
+    """Discussion threads, replies and catalog tool tags.
+
+    Thread lists, thread pages and search results all page by keyset: each
+    page returns a cursor taken from its last row, and the next page starts
+    strictly after it, so deep pages cost the same as the first one.
+    `version()` changes on every write, so callers can cache reads by it.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool or get_pool()
+        self.pool.executescript(_SCHEMA)
+
+    def _bump_version(self, conn):
+        conn.execute(
+            "INSERT INTO forum_meta (key, value) VALUES ('version', 1) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + 1"
+        )
+
+    def version(self):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM forum_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def create_thread(self, title, author, body, tools=()):
+        """Open a thread with its first post; returns the thread id."""
+        now = time.time()
+        with self.pool.connection() as conn:
+            thread_id = conn.execute(
+                "INSERT INTO forum_threads (title, author, created, last_post) VALUES (?, ?, ?, ?)",
+                (title, author, now, now),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO forum_posts (thread_id, author, title, body, created) VALUES (?, ?, ?, ?, ?)",
+                (thread_id, author, title, body, now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO forum_thread_tools (tool, last_post, thread_id) VALUES (?, ?, ?)",
+                [(tool, now, thread_id) for tool in dict.fromkeys(tools)],
+            )
+            self._bump_version(conn)
+        return thread_id
+
+    def reply(self, thread_id, author, body):
+        """Add a reply and move the thread to the top of every list it is in."""
+        now = time.time()
+        with self.pool.connection() as conn:
+            updated = conn.execute(
+                "UPDATE forum_threads SET last_post = ?, reply_count = reply_count + 1 WHERE id = ?",
+                (now, thread_id),
+            ).rowcount
+            if not updated:
+                raise KeyError(thread_id)
+            post_id = conn.execute(
+                "INSERT INTO forum_posts (thread_id, author, body, created) VALUES (?, ?, ?, ?)",
+                (thread_id, author, body, now),
+            ).lastrowid
+            conn.execute("UPDATE forum_thread_tools SET last_post = ? WHERE thread_id = ?", (now, thread_id))
+            self._bump_version(conn)
+        return post_id
+
+    def delete_thread(self, thread_id):
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM forum_threads WHERE id = ?", (thread_id,))
+            self._bump_version(conn)
+
+    def thread(self, thread_id):
+        """(id, title, author, created, last post, reply count, tools), or None."""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id, title, author, created, last_post, reply_count FROM forum_threads WHERE id = ?",
+                (thread_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            tools = [tool for (tool,) in conn.execute(
+                "SELECT tool FROM forum_thread_tools WHERE thread_id = ? ORDER BY tool", (thread_id,)
+            )]
+        return (*row, tools)
+
+    def threads(self, tool=None, after=None, limit=20):
+        """A page of (id, title, author, last post, reply count), most recently active first.
+
+        Returns (rows, cursor); pass `cursor` as `after` for the next page, or
+        stop when it is None.
+        """
+        if tool:
+            query = (
+                "SELECT t.id, t.title, t.author, t.last_post, t.reply_count"
+                " FROM forum_thread_tools tt JOIN forum_threads t ON t.id = tt.thread_id"
+                " WHERE tt.tool = ?"
+            )
+            params = [tool]
+            if after is not None:
+                query += " AND (tt.last_post, tt.thread_id) < (?, ?)"
+                params += after
+            query += " ORDER BY tt.last_post DESC, tt.thread_id DESC LIMIT ?"
+        else:
+            query = "SELECT id, title, author, last_post, reply_count FROM forum_threads"
+            params = []
+            if after is not None:
+                query += " WHERE (last_post, id) < (?, ?)"
+                params += after
+            query += " ORDER BY last_post DESC, id DESC LIMIT ?"
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, (*params, limit + 1)).fetchall()
+        return self._page(rows, limit, lambda row: (row[3], row[0]))
+
+    def posts(self, thread_id, after=None, limit=50):
+        """A page of (id, author, body, created) in posting order, and the next cursor."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, author, body, created FROM forum_posts WHERE thread_id = ? AND id > ?"
+                " ORDER BY id LIMIT ?",
+                (thread_id, after or 0, limit + 1),
+            ).fetchall()
+        return self._page(rows, limit, lambda row: row[0])
+
+    def search(self, query, before=None, limit=20):
+        """Posts matching `query`, newest first: (post id, thread id, thread title, author, snippet, created).
+
+        Results come in rowid order, which FTS5 walks directly from the index
+        instead of ranking every match; `before` is the cursor of the previous page.
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return [], None
+        sql = (
+            "SELECT p.id, p.thread_id, t.title, p.author,"
+            " snippet(forum_fts, 1, '**', '**', '…', 16), p.created"
+            " FROM forum_fts JOIN forum_posts p ON p.id = forum_fts.rowid"
+            " JOIN forum_threads t ON t.id = p.thread_id"
+            " WHERE forum_fts MATCH ?"
+        )
+        params = [expression]
+        if before is not None:
+            sql += " AND forum_fts.rowid < ?"
+            params.append(before)
+        sql += " ORDER BY forum_fts.rowid DESC LIMIT ?"
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, (*params, limit + 1)).fetchall()
+        return self._page(rows, limit, lambda row: row[0])
+
+    @staticmethod
+    def _page(rows, limit, cursor_of):
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, cursor_of(rows[-1])
+        return rows, None
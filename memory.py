@@ -0,0 +1,82 @@
+import gc
+import sys
+from types import MappingProxyType
+
+import pandas as pd
+
+
+def column_bytes(values):
+    """Deep size of one column. Sparse object columns are measured by hand
+    because pandas cannot report their deep usage."""
+    if isinstance(values.dtype, pd.SparseDtype):
+        array = values.array
+        stored = array.sp_values
+        size = array.sp_index.indices.nbytes + stored.nbytes
+        if stored.dtype == object:
+            size += sum(sys.getsizeof(v) for v in stored)
+        return int(size)
+    return int(values.memory_usage(deep=True, index=False))
+
+
+def frame_memory(frame):
+    columns = {column: column_bytes(frame[column]) for column in frame.columns}
+    return {
+        "rows": len(frame),
+        "columns": columns,
+        "index": int(frame.index.memory_usage(deep=True)),
+        "total": sum(columns.values()) + int(frame.index.memory_usage(deep=True)),
+    }
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate retained size of plain Python containers, counting shared objects once."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return frame_memory(obj)["total"]
+    if isinstance(obj, pd.Series):
+        return column_bytes(obj)
+
+    if isinstance(obj, MappingProxyType):
+        # A read-only proxy: count the mapping it wraps
+        return sys.getsizeof(obj) + deep_sizeof(gc.get_referents(obj)[0], seen)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def catalog_memory_report(index):
+    """Bytes held by one CatalogIndex, broken down by component."""
+    seen = set()
+    report = {
+        "version": index.version,
+        "frame": frame_memory(index.frame),
+        # Phase/Description share buffers with `frame`; only the linked names are extra
+        "display": column_bytes(index.display["Tool Name"]),
+        "lookups": deep_sizeof(
+            (index.phase_options, index.all_tools, index.selections, index.tool_rows, index.descriptions), seen
+        ),
+        "search": deep_sizeof(index.search, seen),
+        # Saved vectors are memory-mapped: their pages sit in the shared page cache, not here
+        "similarity": deep_sizeof(index.similarity, seen),
+    }
+    report["total"] = (report["frame"]["total"] + report["display"] + report["lookups"] + report["search"]
+                       + report["similarity"])
+    return report
+
+
+def session_memory_report(state):
+    """Bytes held per session_state key; `state` is any mapping."""
+    seen = set()
+    keys = {str(key): deep_sizeof(value, seen) for key, value in state.items()}
+    return {"keys": keys, "total": sum(keys.values())}
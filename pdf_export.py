@@ -0,0 +1,197 @@
+"""Streaming PDF writer for Project Plans.
+
+Produces the same layout as the FPDF loop in exports.render_pdf_fpdf (A4,
+Helvetica, one heading and two lines per task) but:
+
+* task text is prepared for a whole chunk of rows at once, using C-level
+  str.encode/translate instead of a per-character filter per row, and
+* each page is compressed and written to the output as soon as it is full,
+  so only one page of content is held in memory however long the plan is.
+"""
+import io
+import zlib
+
+# FPDF geometry: A4 in mm, 1 cm margins, 1 mm cell padding, 15 mm bottom break
+K = 72 / 25.4
+PAGE_W = 595.28 / K
+PAGE_H = 841.89 / K
+MARGIN = 28.35 / K
+CELL_MARGIN = MARGIN / 10
+BREAK_AT = PAGE_H - 15
+
+# Style -> (resource name, base font, FPDF metrics key)
+FONTS = {
+    "": ("F1", "Helvetica", "helvetica"),
+    "B": ("F2", "Helvetica-Bold", "helveticaB"),
+    "I": ("F3", "Helvetica-Oblique", "helveticaI"),
+}
+
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)", "\r": "\\r"})
+
+
+def _pdf_text(text):
+    return text.translate(_ESCAPES)
+
+
+def prepare_rows(chunk):
+    """(heading, task line) pairs for a chunk of plan rows, escaped for a PDF string.
+
+    Works on whole columns at once; str.encode/translate run in C per string."""
+    headings = [f"{phase} Phase".translate(_ESCAPES) for phase in chunk["PDCA Phase"].tolist()]
+    lines = [
+        # Keep only ASCII characters
+        f"{name if isinstance(name, str) and name else 'Unnamed Task'} - "
+        f"{description if isinstance(description, str) and description else 'No Description Available'}"
+        .encode("ascii", "ignore").decode("ascii").translate(_ESCAPES)
+        for name, description in zip(chunk["Task Name"].tolist(), chunk["Description"].tolist())
+    ]
+    return zip(headings, lines)
+
+
+class _PageStream:
+    """Lays out cells like FPDF.cell(0, h, txt, ln=1) and streams finished pages to `out`."""
+
+    def __init__(self, out):
+        from fpdf.fonts import fpdf_charwidths
+
+        self._widths = fpdf_charwidths
+        self.out = out
+        self.position = 0
+        self.offsets = {}
+        self.page_objects = []
+        self._next_object = 6  # 1 = page tree, 2-4 = fonts, 5 = resources
+        self._ops = None
+        self._font = None
+        self.y = MARGIN
+
+    # --- low-level object output ---
+    def _write(self, data):
+        self.out.write(data)
+        self.position += len(data)
+
+    def _object(self, number, body):
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _allocate(self):
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    # --- layout ---
+    def _set_font(self, style, size):
+        self._font = (style, size)
+        self._ops.append(f"BT /{FONTS[style][0]} {size:.2f} Tf ET")
+
+    def add_page(self):
+        self.finish_page()
+        self._ops = []
+        self.y = MARGIN
+        if self._font is not None:
+            self._set_font(*self._font)
+
+    def finish_page(self):
+        if self._ops is None:
+            return
+        content = zlib.compress("\n".join(self._ops).encode("latin-1"))
+        page, stream = self._allocate(), self._allocate()
+        self._object(page, b"<</Type /Page /Parent 1 0 R /Resources 5 0 R /Contents %d 0 R>>" % stream)
+        self._object(stream, b"<</Filter /FlateDecode /Length %d>>\nstream\n" % len(content) + content + b"\nendstream")
+        self.page_objects.append(page)
+        self._ops = None
+
+    def set_font(self, style, size):
+        if self._font != (style, size):
+            self._set_font(style, size)
+
+    def string_width(self, text):
+        widths = self._widths[FONTS[self._font[0]][2]]
+        return sum(widths.get(c, 0) for c in text) * self._font[1] / K / 1000
+
+    def cell(self, h, text, align="L", width_text=None):
+        """One full-width line. `text` is already escaped; `width_text` is the raw text for centring."""
+        if self.y + h > BREAK_AT:
+            self.add_page()
+        if text:
+            if align == "C":
+                dx = (PAGE_W - 2 * MARGIN - self.string_width(width_text)) / 2
+            else:
+                dx = CELL_MARGIN
+            font_size = self._font[1] / K
+            self._ops.append("BT %.2f %.2f Td (%s) Tj ET" % (
+                (MARGIN + dx) * K, (PAGE_H - (self.y + .5 * h + .3 * font_size)) * K, text))
+        self.y += h
+
+    def ln(self, h):
+        self.y += h
+
+    # --- document ---
+    def begin(self):
+        self._write(b"%PDF-1.3\n")
+        for number, (_, base_font, _) in enumerate(FONTS.values(), start=2):
+            self._object(number, b"<</Type /Font /BaseFont /%s /Subtype /Type1 /Encoding /WinAnsiEncoding>>"
+                         % base_font.encode())
+        fonts = b" ".join(b"/%s %d 0 R" % (name.encode(), number)
+                          for number, (name, _, _) in enumerate(FONTS.values(), start=2))
+        self._object(5, b"<</ProcSet [/PDF /Text] /Font <<" + fonts + b">>>>")
+
+    def end(self, title):
+        self.finish_page()
+        kids = b" ".join(b"%d 0 R" % page for page in self.page_objects)
+        self._object(1, b"<</Type /Pages /Kids [%s] /Count %d /MediaBox [0 0 %.2f %.2f]>>"
+                     % (kids, len(self.page_objects), PAGE_W * K, PAGE_H * K))
+        info, catalog = self._allocate(), self._allocate()
+        self._object(info, b"<</Producer (PDCA Toolshed) /Title (%s)>>" % _pdf_text(title).encode("latin-1"))
+        self._object(catalog, b"<</Type /Catalog /Pages 1 0 R /OpenAction [%d 0 R /FitH null]>>"
+                     % self.page_objects[0])
+
+        xref_at = self.position
+        total = self._next_object
+        entries = [b"0000000000 65535 f \n"] + [b"%010d 00000 n \n" % self.offsets[n] for n in range(1, total)]
+        self._write(b"xref\n0 %d\n" % total + b"".join(entries))
+        self._write(b"trailer\n<</Size %d /Root %d 0 R /Info %d 0 R>>\nstartxref\n%d\n%%%%EOF\n"
+                    % (total, catalog, info, xref_at))
+
+
+def _latin1(text):
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def write_plan_pdf(plan_df, project_name, project_owner, created_date, out, chunk_size=500):
+    """Stream the Project Plan PDF for `plan_df` into the binary file object `out`."""
+    pages = _PageStream(out)
+    pages.begin()
+    pages.add_page()
+
+    # ✅ Title Section
+    title = _latin1(f"Project Plan - {project_name}")
+    owner_line = _latin1(f"Owner: {project_owner}    Created: {created_date}")
+    pages.set_font("B", 16)
+    pages.cell(10, _pdf_text(title), align="C", width_text=title)
+    pages.set_font("", 12)
+    pages.cell(10, _pdf_text(owner_line), align="C", width_text=owner_line)
+    pages.ln(10)
+
+    # ✅ Write tasks chunk by chunk
+    if len(plan_df):
+        for start in range(0, len(plan_df), chunk_size):
+            for heading, line in prepare_rows(plan_df.iloc[start:start + chunk_size]):
+                pages.set_font("B", 14)
+                pages.cell(8, heading)
+                pages.set_font("", 12)
+                pages.cell(6, line)
+                pages.cell(6, "Start Date: ______    Completion Date: ______")
+                pages.ln(4)
+    else:
+        empty = "No tasks selected for this project plan."
+        pages.set_font("I", 12)
+        pages.cell(10, empty, align="C", width_text=empty)
+
+    pages.end(title)
+
+
+def render_plan_pdf(plan_df, project_name, project_owner, created_date):
+    buffer = io.BytesIO()
+    write_plan_pdf(plan_df, project_name, project_owner, created_date, buffer)
+    return buffer.getvalue()
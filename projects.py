@@ -0,0 +1,76 @@
+import json
+import time
+
+from catalog import PDCA_PHASES
+from db import get_pool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_date TEXT NOT NULL,
+    tools TEXT NOT NULL,
+    updated REAL NOT NULL,
+    UNIQUE (owner, name)
+);
+CREATE INDEX IF NOT EXISTS projects_owner_updated ON projects (owner, updated);
+CREATE INDEX IF NOT EXISTS projects_name ON projects (name);
+CREATE INDEX IF NOT EXISTS projects_updated ON projects (updated);
+"""
+
+
+class ProjectStore:
+    """Saved project plans, keyed by (owner, name)."""
+
+    def __init__(self, pool=None):
+        self.pool = pool or get_pool()
+        self.pool.executescript(_SCHEMA)
+
+    def save(self, name, owner, created_date, selected_tools):
+        """Insert or overwrite a plan in a single transaction."""
+        tools = json.dumps({phase: list(selected_tools.get(phase, [])) for phase in PDCA_PHASES})
+        with self.pool.connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO projects (owner, name, created_date, tools, updated) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (owner, name) DO UPDATE SET
+                    created_date = excluded.created_date,
+                    tools = excluded.tools,
+                    updated = excluded.updated
+                """,
+                (owner, name, created_date, tools, time.time()),
+            )
+
+    def load(self, owner, name):
+        """The saved plan as a dict, or None."""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT name, owner, created_date, tools FROM projects WHERE owner = ? AND name = ?",
+                (owner, name),
+            ).fetchone()
+        if row is None:
+            return None
+        name, owner, created_date, tools = row
+        return {"project_name": name, "project_owner": owner, "created_date": created_date,
+                "selected_tools": json.loads(tools)}
+
+    def list(self, owner=None, name=None, limit=100):
+        """(owner, name, created date) of saved plans, most recently updated first."""
+        query = "SELECT owner, name, created_date FROM projects"
+        clauses, params = [], []
+        if owner:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if name:
+            clauses.append("name = ?")
+            params.append(name)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY updated DESC LIMIT ?"
+        with self.pool.connection() as conn:
+            return conn.execute(query, (*params, limit)).fetchall()
+
+    def delete(self, owner, name):
+        with self.pool.connection() as conn:
+            conn.execute("DELETE FROM projects WHERE owner = ? AND name = ?", (owner, name))
@@ -0,0 +1,235 @@
+import json
+import sqlite3
+import threading
+from itertools import combinations
+
+import numpy as np
+
+from usage import USAGE_DB_PATH
+
+
+def _plan_tools(selected_tools):
+    """Distinct tools of a plan, from a {phase: [tools]} dict or any iterable of names."""
+    if isinstance(selected_tools, dict):
+        selected_tools = [tool for tools in selected_tools.values() for tool in tools]
+    return list(dict.fromkeys(selected_tools))
+
+
+def plan_key(owner, name, plan_hash=None):
+    """Identity of a plan for co-occurrence counting: (owner, name), or its content hash when unnamed.
+
+    Saving and exporting the same plan, or re-exporting it, updates one entry
+    instead of counting its tool pairs again."""
+    return json.dumps([owner or "", name]) if name else plan_hash
+
+
+class CooccurrenceMatrix:
+    """How often two tools appear in the same saved or exported plan.
+
+    Counts live in a symmetric tool x tool matrix: compressed rows (NumPy
+    indptr/indices/data arrays) plus a small dict of pending increments. A new
+    plan only touches the dict; once it holds `compact_every` entries it is
+    folded into fresh arrays in one vectorized pass. Every plan is counted
+    once under its `plan_key`, with the tools it was last saved or exported with.
+    """
+
+    def __init__(self, compact_every=20000):
+        self.compact_every = compact_every
+        self._index = {}
+        self._names = []
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+        self._data = np.empty(0, dtype=np.int32)
+        self._delta = {}
+        self._delta_size = 0
+        self._plans = {}
+        self._lock = threading.Lock()
+        self._candidates = {}
+        self._upper = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def _id(self, tool):
+        tool_id = self._index.get(tool)
+        if tool_id is None:
+            tool_id = self._index[tool] = len(self._names)
+            self._names.append(tool)
+        return tool_id
+
+    def _bump(self, a, b, count):
+        for row, column in ((a, b), (b, a)):
+            entries = self._delta.setdefault(row, {})
+            if column not in entries:
+                self._delta_size += 1
+            entries[column] = entries.get(column, 0) + count
+
+    def _add(self, tools, weight):
+        """Count every pair of `tools`; `weight=-1` takes them back out. Hold the lock."""
+        ids = sorted(self._id(tool) for tool in tools)
+        for a, b in combinations(ids, 2):
+            self._bump(a, b, weight)
+
+    def set_plan(self, key, selected_tools):
+        """Count plan `key` with these tools, replacing the tools it was counted with before.
+
+        Empty or None `selected_tools` removes the plan."""
+        tools = tuple(_plan_tools(selected_tools or ()))
+        with self._lock:
+            previous = self._plans.get(key, ())
+            if set(tools) == set(previous):
+                return
+            if tools:
+                self._plans[key] = tools
+            else:
+                self._plans.pop(key, None)
+            self._add(previous, -1)
+            self._add(tools, 1)
+            if self._delta_size >= self.compact_every:
+                self._compact()
+
+    def add_plans(self, plans):
+        """Bulk-add many new plans ({plan key: {phase: [tools]} dict or iterable of names}) in one merge."""
+        firsts, seconds = [], []
+        with self._lock:
+            for key, plan in plans.items():
+                tools = self._plans[key] = tuple(_plan_tools(plan))
+                ids = np.fromiter(map(self._id, tools), dtype=np.int64, count=len(tools))
+                if len(ids) < 2:
+                    continue
+                upper = self._upper.get(len(ids))
+                if upper is None:
+                    upper = self._upper[len(ids)] = np.triu_indices(len(ids), k=1)
+                firsts.append(ids[upper[0]])
+                seconds.append(ids[upper[1]])
+            if firsts:
+                a, b = np.concatenate(firsts), np.concatenate(seconds)
+                size = len(self._names)
+                keys, counts = np.unique(np.minimum(a, b) * size + np.maximum(a, b), return_counts=True)
+                self._merge_pairs(keys // size, keys % size, counts)
+
+    def _merge_pairs(self, a, b, counts):
+        """Add distinct pairs in both directions. Hold the lock."""
+        size = len(self._names)
+        keys = np.concatenate([a * size + b, b * size + a])
+        order = np.argsort(keys)
+        self._merge(keys[order], np.concatenate([counts, counts])[order])
+
+    def _merge(self, keys, counts):
+        """Add sorted, distinct `row * len(self) + column` keys into the compressed rows. Hold the lock.
+
+        Existing entries are found with a binary search and new ones inserted
+        in place, so a merge costs one pass over the stored pairs, not a sort.
+        """
+        size = len(self._names)
+        rows = len(self._indptr) - 1
+        stored = np.repeat(np.arange(rows, dtype=np.int64), np.diff(self._indptr)) * size + self._indices
+        data = self._data.astype(np.int64)
+        positions = np.searchsorted(stored, keys)
+        found = positions < len(stored)
+        found[found] = stored[positions[found]] == keys[found]
+        data[positions[found]] += counts[found]
+        new = ~found
+        stored = np.insert(stored, positions[new], keys[new])
+        data = np.insert(data, positions[new], counts[new])
+        if len(data) and data.min() <= 0:
+            keep = data > 0
+            stored, data = stored[keep], data[keep]
+        self._indptr = np.searchsorted(stored, np.arange(size + 1, dtype=np.int64) * size).astype(np.int64)
+        self._indices = (stored % size if size else stored).astype(np.int32)
+        self._data = data.astype(np.int32)
+
+    def _compact(self):
+        """Fold the pending increments into the compressed rows. Hold the lock."""
+        if self._delta:
+            size = len(self._names)
+            keys = np.fromiter(
+                (row * size + column for row, entries in self._delta.items() for column in entries),
+                dtype=np.int64, count=self._delta_size,
+            )
+            counts = np.fromiter(
+                (count for entries in self._delta.values() for count in entries.values()),
+                dtype=np.int64, count=self._delta_size,
+            )
+            order = np.argsort(keys)
+            self._merge(keys[order], counts[order])
+        self._delta = {}
+        self._delta_size = 0
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def _candidate_ids(self, candidates):
+        """Matrix ids of a tuple of tool names, cached per tuple (catalog tuples live for a catalog version)."""
+        cached = self._candidates.get(id(candidates))
+        if cached is None or cached[0] is not candidates or cached[2] != len(self._names):
+            names = [tool for tool in candidates if tool in self._index]
+            ids = np.fromiter((self._index[tool] for tool in names), dtype=np.int64, count=len(names))
+            if len(self._candidates) > 64:
+                self._candidates.clear()
+            cached = self._candidates[id(candidates)] = (candidates, ids, len(self._names))
+        return cached[1]
+
+    def recommend(self, selected, candidates, k=3):
+        """Top `k` tools from `candidates` most often planned together with `selected`.
+
+        Returns (tool, count, strongest selected tool) triples, best first.
+        """
+        with self._lock:
+            size = len(self._names)
+            selected_ids = [self._index[tool] for tool in _plan_tools(selected) if tool in self._index]
+            if not selected_ids or not size:
+                return []
+            scores = np.zeros(size, dtype=np.int64)
+            best = np.zeros(size, dtype=np.int64)
+            because = np.full(size, -1, dtype=np.int64)
+            for tool_id in selected_ids:
+                row = np.zeros(size, dtype=np.int64)
+                if tool_id < len(self._indptr) - 1:
+                    start, end = self._indptr[tool_id], self._indptr[tool_id + 1]
+                    row[self._indices[start:end]] = self._data[start:end]
+                for column, count in self._delta.get(tool_id, {}).items():
+                    row[column] += count
+                scores += row
+                stronger = row > best
+                best[stronger] = row[stronger]
+                because[stronger] = tool_id
+            candidate_ids = self._candidate_ids(candidates)
+            names = self._names
+
+        scores[selected_ids] = 0
+        candidate_scores = scores[candidate_ids]
+        if len(candidate_scores) > k:
+            top = np.argpartition(-candidate_scores, k)[:k]
+        else:
+            top = np.arange(len(candidate_scores))
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        return [
+            (names[candidate_ids[i]], int(candidate_scores[i]), names[because[candidate_ids[i]]])
+            for i in top if candidate_scores[i] > 0
+        ]
+
+
+def load_cooccurrence(pool, usage_path=USAGE_DB_PATH, matrix=None):
+    """Build the matrix from every saved and exported plan, each counted once with its latest tools."""
+    matrix = matrix or CooccurrenceMatrix()
+    plans = []
+    try:
+        with sqlite3.connect(usage_path) as conn:
+            plans += conn.execute("SELECT plan, tools, updated FROM plan_tools").fetchall()
+    except sqlite3.Error:
+        pass
+    with pool.connection() as conn:
+        try:
+            plans += [
+                (plan_key(owner, name), tools, updated)
+                for owner, name, tools, updated in conn.execute("SELECT owner, name, tools, updated FROM projects")
+            ]
+        except sqlite3.OperationalError:
+            pass
+    latest = {}
+    for key, tools, updated in sorted(plans, key=lambda plan: plan[2]):
+        latest[key] = tools
+    matrix.add_plans({key: json.loads(tools) for key, tools in latest.items()})
+    return matrix
@@ -0,0 +1,254 @@
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db import DATA_DIR, get_pool
+
+REPOSITORY_DIR = os.path.join(DATA_DIR, "repository")
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = (320, 320)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repo_blobs (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mime TEXT NOT NULL,
+    thumbnail INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS repo_files (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES repo_blobs (sha256),
+    name TEXT NOT NULL,
+    phase TEXT,
+    uploader TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    uploaded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS repo_files_uploaded ON repo_files (uploaded, id);
+CREATE INDEX IF NOT EXISTS repo_files_phase ON repo_files (phase, uploaded, id);
+CREATE INDEX IF NOT EXISTS repo_files_uploader ON repo_files (uploader, uploaded, id);
+CREATE INDEX IF NOT EXISTS repo_files_sha256 ON repo_files (sha256);
+CREATE TABLE IF NOT EXISTS repo_file_tools (
+    tool TEXT NOT NULL,
+    file_id INTEGER NOT NULL REFERENCES repo_files (id) ON DELETE CASCADE,
+    PRIMARY KEY (tool, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS repo_file_tools_file ON repo_file_tools (file_id);
+"""
+
+# repo_blobs.thumbnail: NULL while pending, then one of these
+THUMBNAIL_READY = 1
+THUMBNAIL_NONE = 0
+
+
+def _image_thumbnail(path, out):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.thumbnail(THUMBNAIL_SIZE)
+        image.convert("RGB").save(out, "PNG")
+
+
+def _pdf_thumbnail(path, out):
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as document:
+        page = document[0]
+        zoom = min(THUMBNAIL_SIZE[0] / page.rect.width, THUMBNAIL_SIZE[1] / page.rect.height)
+        page.get_pixmap(matrix=fitz.Matrix(zoom, zoom)).save(out, output="png")
+
+
+THUMBNAILERS = {
+    "image/png": _image_thumbnail,
+    "image/jpeg": _image_thumbnail,
+    "image/gif": _image_thumbnail,
+    "image/webp": _image_thumbnail,
+    "application/pdf": _pdf_thumbnail,
+}
+
+
+def blob_path(blobs_dir, sha256):
+    return os.path.join(blobs_dir, sha256[:2], sha256)
+
+
+def write_blob(blobs_dir, source, chunk_size=CHUNK_SIZE):
+    """Copy binary file object `source` into `blobs_dir` chunk by chunk while hashing it.
+
+    The blob ends up at `blob_path(blobs_dir, sha256)`; bytes already stored
+    are not written twice. Returns (sha256, size).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    os.makedirs(blobs_dir, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(dir=blobs_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        path = blob_path(blobs_dir, sha256)
+        if os.path.exists(path):
+            os.remove(temporary)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return sha256, size
+
+
+class FileRepository:
+    """Shared CI files, stored once per content hash.
+
+    Blobs live under `root/blobs/ab/<sha256>`; every upload of the same bytes
+    adds a metadata row pointing at the same blob. Thumbnails for images and
+    PDFs are rendered by a small thread pool after the upload returns.
+    """
+
+    def __init__(self, pool=None, root=REPOSITORY_DIR, thumbnail_workers=2):
+        self.pool = pool or get_pool()
+        self.pool.executescript(_SCHEMA)
+        self.root = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(root, "thumbnails"), exist_ok=True)
+        self._thumbnails = ThreadPoolExecutor(max_workers=thumbnail_workers, thread_name_prefix="repo-thumbnail")
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._resume_thumbnails()
+
+    def path(self, sha256):
+        return blob_path(os.path.join(self.root, "blobs"), sha256)
+
+    def thumbnail_path(self, sha256):
+        return os.path.join(self.root, "thumbnails", f"{sha256}.png")
+
+    def add(self, source, name, uploader, phase=None, tools=(), description="", chunk_size=CHUNK_SIZE):
+        """Store a binary file object and its metadata; returns (file id, sha256, new blob?)."""
+        sha256, size = write_blob(os.path.join(self.root, "blobs"), source, chunk_size)
+        mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        with self.pool.connection() as conn:
+            new_blob = conn.execute(
+                "INSERT OR IGNORE INTO repo_blobs (sha256, size, mime) VALUES (?, ?, ?)", (sha256, size, mime)
+            ).rowcount == 1
+            file_id = conn.execute(
+                "INSERT INTO repo_files (sha256, name, phase, uploader, description, uploaded)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, name, phase or None, uploader, description, time.time()),
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO repo_file_tools (tool, file_id) VALUES (?, ?)",
+                [(tool, file_id) for tool in tools],
+            )
+        if new_blob:
+            self._queue_thumbnail(sha256, mime)
+        return file_id, sha256, new_blob
+
+    def files(self, phase=None, tool=None, uploader=None, before=None, limit=50):
+        """A page of (id, name, phase, uploader, description, uploaded, sha256, size, mime, has thumbnail),
+        newest first, and the cursor of the next page (None on the last page)."""
+        query = (
+            "SELECT f.id, f.name, f.phase, f.uploader, f.description, f.uploaded, f.sha256, b.size, b.mime,"
+            " b.thumbnail = 1 FROM repo_files f JOIN repo_blobs b ON b.sha256 = f.sha256"
+        )
+        clauses, params = [], []
+        if tool:
+            query += " JOIN repo_file_tools ft ON ft.file_id = f.id"
+            clauses.append("ft.tool = ?")
+            params.append(tool)
+        if phase:
+            clauses.append("f.phase = ?")
+            params.append(phase)
+        if uploader:
+            clauses.append("f.uploader = ?")
+            params.append(uploader)
+        if before is not None:
+            clauses.append("(f.uploaded, f.id) < (?, ?)")
+            params += before
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY f.uploaded DESC, f.id DESC LIMIT ?"
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, (*params, limit + 1)).fetchall()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, (rows[-1][5], rows[-1][0])
+        return rows, None
+
+    def tools(self, file_id):
+        with self.pool.connection() as conn:
+            return [tool for (tool,) in conn.execute(
+                "SELECT tool FROM repo_file_tools WHERE file_id = ? ORDER BY tool", (file_id,)
+            )]
+
+    def uploaders(self):
+        with self.pool.connection() as conn:
+            return [uploader for (uploader,) in conn.execute("SELECT DISTINCT uploader FROM repo_files ORDER BY 1")]
+
+    def mime(self, sha256):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT mime FROM repo_blobs WHERE sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def open(self, sha256):
+        """The stored blob as a binary file object."""
+        return open(self.path(sha256), "rb")
+
+    def _queue_thumbnail(self, sha256, mime):
+        if mime not in THUMBNAILERS:
+            self._set_thumbnail(sha256, THUMBNAIL_NONE)
+            return
+        with self._pending_lock:
+            if sha256 in self._pending:
+                return
+            self._pending.add(sha256)
+        self._thumbnails.submit(self._render_thumbnail, sha256, mime)
+
+    def _render_thumbnail(self, sha256, mime):
+        out = self.thumbnail_path(sha256)
+        try:
+            THUMBNAILERS[mime](self.path(sha256), out + ".part")
+            os.replace(out + ".part", out)
+            state = THUMBNAIL_READY
+        except Exception:
+            # Unreadable files and a missing optional renderer both just mean no preview
+            if os.path.exists(out + ".part"):
+                os.remove(out + ".part")
+            state = THUMBNAIL_NONE
+        finally:
+            with self._pending_lock:
+                self._pending.discard(sha256)
+        try:
+            self._set_thumbnail(sha256, state)
+        except sqlite3.Error:
+            pass
+
+    def _set_thumbnail(self, sha256, state):
+        with self.pool.connection() as conn:
+            conn.execute("UPDATE repo_blobs SET thumbnail = ? WHERE sha256 = ?", (state, sha256))
+
+    def _resume_thumbnails(self):
+        """Re-queue thumbnails a previous process did not get to."""
+        with self.pool.connection() as conn:
+            pending = conn.execute("SELECT sha256, mime FROM repo_blobs WHERE thumbnail IS NULL").fetchall()
+        for sha256, mime in pending:
+            self._queue_thumbnail(sha256, mime)
+
+    def wait_for_thumbnails(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while self._pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        self._thumbnails.shutdown(wait=True)
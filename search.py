@@ -0,0 +1,97 @@
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+# Runs of Unicode letters and digits ("Größe" -> "grösse" after casefolding)
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# ✅ Relevance weights: any name hit outranks any description hit
+NAME_EXACT, NAME_PREFIX = 40, 30
+DESC_EXACT, DESC_PREFIX = 2, 1
+
+# Shorter terms only match whole tokens
+MIN_PREFIX_LEN = 2
+
+
+def tokenize(text):
+    if not isinstance(text, str):
+        return []
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class SearchIndex:
+    """Inverted index over tool names and descriptions.
+
+    Queries are split into terms; every term must prefix-match a token in the
+    name or description of a row (AND semantics). Rows are ranked by summed
+    term weights, then by catalog order.
+
+    Each field keeps its tokens sorted with their postings in one NumPy array
+    (compressed rows), so the tokens a prefix matches are one contiguous slice
+    and a query is scored with array operations over all rows.
+    """
+
+    def __init__(self, names, descriptions):
+        self.size = len(names)
+        self._names = self._build(names)
+        self._descriptions = self._build(descriptions)
+
+    @staticmethod
+    def _build(texts):
+        """(sorted tokens, indptr, rows): rows containing tokens[i] are rows[indptr[i]:indptr[i + 1]]."""
+        postings = {}
+        for row, text in enumerate(texts):
+            for token in set(tokenize(text)):
+                postings.setdefault(token, []).append(row)
+        tokens = sorted(postings)
+        indptr = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum([len(postings[token]) for token in tokens], out=indptr[1:])
+        rows = np.fromiter((row for token in tokens for row in postings[token]), dtype=np.int32, count=indptr[-1])
+        return tokens, indptr, rows
+
+    @staticmethod
+    def _matches(field, term):
+        """(rows with the token `term`, rows with a longer token starting with `term`)."""
+        tokens, indptr, rows = field
+        start = bisect_left(tokens, term)
+        exact_end = start + 1 if start < len(tokens) and tokens[start] == term else start
+        end = exact_end
+        if len(term) >= MIN_PREFIX_LEN:  # One-letter prefixes would touch most of the index
+            end = bisect_left(tokens, term[:-1] + chr(ord(term[-1]) + 1), lo=exact_end)
+        return rows[indptr[start]:indptr[exact_end]], rows[indptr[exact_end]:indptr[end]]
+
+    def _term_scores(self, term):
+        """Best weight per row for one term; lower weights are written first so higher ones win."""
+        scores = np.zeros(self.size, dtype=np.int32)
+        for field, exact_weight, prefix_weight in (
+            (self._descriptions, DESC_EXACT, DESC_PREFIX),
+            (self._names, NAME_EXACT, NAME_PREFIX),
+        ):
+            exact, prefix = self._matches(field, term)
+            scores[prefix] = prefix_weight
+            scores[exact] = exact_weight
+        return scores
+
+    def search(self, query, limit=None):
+        """Return matching row positions, best match first; at most `limit` of them.
+
+        An empty query matches every row."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            rows = range(self.size) if not (query or "").strip() else []
+            return list(rows[:limit])
+
+        totals = np.zeros(self.size, dtype=np.int64)
+        matched = np.ones(self.size, dtype=bool)
+        for term in terms:
+            scores = self._term_scores(term)
+            matched &= scores > 0
+            totals += scores
+        rows = np.flatnonzero(matched)
+        # One key per row: higher score first, then lower row
+        keys = totals[rows] * (self.size + 1) - rows
+        if limit is not None and len(rows) > limit:
+            top = np.argpartition(-keys, limit - 1)[:limit] if limit else rows[:0]
+            rows, keys = rows[top], keys[top]
+        return rows[np.argsort(-keys)].tolist()
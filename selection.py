@@ -0,0 +1,177 @@
+import base64
+import threading
+from collections import OrderedDict
+
+# Query parameters of a shared plan link
+PARAM_TOOLS = "tools"
+PARAM_CATALOG = "catalog"
+PARAM_FIELDS = {"project": "project_name", "owner": "project_owner", "created": "created_date"}
+
+# Catalog versions whose codecs stay available for translating older selections and links
+KEEP_VERSIONS = 8
+VERSION_PREFIX = 12
+
+
+def _set_slots(bits):
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class SelectionCodec:
+    """Tool selections as one integer bitset over a catalog version's tool slots.
+
+    Slots follow `CatalogIndex.all_tools`, so each PDCA phase owns one
+    contiguous run of bits: reading, masking or diffing a phase is a shift
+    and an AND, and a whole selection is a single int in session state.
+    """
+
+    def __init__(self, phase_options, version=None):
+        self.version = version
+        self.slots = tuple(tool for options in phase_options.values() for tool in options)
+        self._masks = {}
+        self._slot = {}
+        start = 0
+        for phase, options in phase_options.items():
+            self._masks[phase] = ((1 << len(options)) - 1) << start
+            for offset, tool in enumerate(options):
+                self._slot.setdefault((phase, tool), start + offset)
+            start += len(options)
+
+    @property
+    def phases(self):
+        return tuple(self._masks)
+
+    def mask(self, phase):
+        return self._masks.get(phase, 0)
+
+    def encode_phase(self, phase, tools):
+        slots = (self._slot.get((phase, tool)) for tool in tools)
+        return sum(1 << slot for slot in set(slots) if slot is not None)
+
+    def encode(self, selected_tools):
+        """Bitset of a {phase: [tools]} dict; tools not in the catalog are dropped."""
+        bits = 0
+        for phase, tools in selected_tools.items():
+            bits |= self.encode_phase(phase, tools)
+        return bits
+
+    def tools(self, bits):
+        """Tool names of the set bits, in slot order; costs one step per set bit."""
+        return [self.slots[slot] for slot in _set_slots(bits)]
+
+    def decode(self, bits):
+        return {phase: self.tools(bits & mask) for phase, mask in self._masks.items()}
+
+
+_codecs = OrderedDict()
+_codecs_lock = threading.Lock()
+
+
+def register_codec(codec):
+    with _codecs_lock:
+        _codecs[codec.version] = codec
+        _codecs.move_to_end(codec.version)
+        while len(_codecs) > KEEP_VERSIONS:
+            _codecs.popitem(last=False)
+
+
+def codec_for(version):
+    """The codec of a recent catalog version (or a prefix of one, as in links), else None."""
+    if not version:
+        return None
+    with _codecs_lock:
+        return next((codec for known, codec in _codecs.items() if known.startswith(version)), None)
+
+
+def translate(bits, source, target):
+    """Move a selection between catalog versions by tool name."""
+    if source is target:
+        return bits
+    return target.encode(source.decode(bits)) if source is not None else 0
+
+
+# Prefix of the sparse encoding; "~" is URL-safe and not in the base64url alphabet
+SPARSE_PREFIX = "~"
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def bits_to_param(bits):
+    """URL text of a selection: the gaps between selected slots as varints, or the
+    raw bitmap when that is shorter (dense selections in a small catalog)."""
+    varints = bytearray()
+    previous = -1
+    for slot in _set_slots(bits):
+        gap = slot - previous - 1
+        previous = slot
+        while gap >= 0x80:
+            varints.append(gap & 0x7F | 0x80)
+            gap >>= 7
+        varints.append(gap)
+    bitmap = _b64(bits.to_bytes((bits.bit_length() + 7) // 8, "little"))
+    sparse = SPARSE_PREFIX + _b64(bytes(varints))
+    return sparse if len(sparse) < len(bitmap) else bitmap
+
+
+def bits_from_param(text, size):
+    """Inverse of bits_to_param for a catalog of `size` slots; ValueError for text that is not one."""
+    if not text.startswith(SPARSE_PREFIX):
+        return int.from_bytes(_unb64(text), "little") & ((1 << size) - 1)
+    bits = 0
+    slot = -1
+    gap = shift = 0
+    for byte in _unb64(text[len(SPARSE_PREFIX):]):
+        gap |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        slot += gap + 1
+        if slot >= size:
+            raise ValueError("slot outside the catalog")
+        bits |= 1 << slot
+        gap = shift = 0
+    if shift:
+        raise ValueError("truncated varint")
+    return bits
+
+
+def plan_params(codec, bits, fields):
+    """Query parameters that restore this selection and the project `fields` (session_state keys)."""
+    params = {PARAM_TOOLS: bits_to_param(bits), PARAM_CATALOG: (codec.version or "")[:VERSION_PREFIX]}
+    for param, key in PARAM_FIELDS.items():
+        if fields.get(key):
+            params[param] = fields[key]
+    return params
+
+
+def read_plan_params(params, codec):
+    """(bits, project fields, stale link?) from query parameters; bits are None when the link has no tools.
+
+    A link made for an older catalog is translated by tool name while that
+    catalog's codec is still known; otherwise its selection is dropped and
+    the link reported stale.
+    """
+    fields = {key: params[param] for param, key in PARAM_FIELDS.items() if params.get(param)}
+    encoded = params.get(PARAM_TOOLS)
+    if not encoded:
+        return None, fields, False
+    version = params.get(PARAM_CATALOG, "")
+    if codec.version is None or (codec.version or "").startswith(version):
+        source = codec
+    else:
+        source = codec_for(version)
+    if source is None:
+        return None, fields, True
+    try:
+        bits = bits_from_param(encoded, len(source.slots))
+    except ValueError:
+        return None, fields, True
+    return translate(bits, source, codec), fields, False
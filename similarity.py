@@ -0,0 +1,220 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from search import tokenize
+
+# Words that say nothing about what a tool does
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from how in into is it its of on or that the their this to "
+    "used use uses using was what when where which while who why will with your you".split()
+)
+
+# Tool names count double: they are short and on topic
+NAME_WEIGHT = 2
+
+_FILES = ("idf", "vectors")
+_NEIGHBOR_FILES = ("neighbors", "scores")
+# Bumped whenever terms() or the weighting changes, so saved indexes are rebuilt
+FORMAT = 2
+
+# Up to this many tools, every tool's neighbours are found when the index is built
+# (an all-pairs product); larger catalogs look them up per page shown
+PRECOMPUTE_LIMIT = 5000
+# The dense vectors are capped at this many cells; big catalogs keep fewer terms
+MAX_VECTOR_CELLS = 32 * 1024 * 1024
+
+
+def terms(text):
+    """Tokens without stop words or bare numbers; a trailing plural "s" is dropped so "causes" matches "cause"."""
+    return [
+        token[:-1] if len(token) > 3 and token.endswith("s") and not token.endswith("ss") else token
+        for token in tokenize(text)
+        if len(token) > 1 and token not in STOP_WORDS and not token.isdigit()
+    ]
+
+
+class SimilarityIndex:
+    """TF-IDF vectors of the catalog tools, one L2-normalized row per tool.
+
+    Rows line up with the catalog frame. Cosine similarity is a matrix
+    product, so a batch of queries is one `queries @ vectors.T`. For
+    catalogs up to `PRECOMPUTE_LIMIT` tools the `k` nearest tools of every
+    row are computed once, when the index is built; above that `neighbors`
+    is None and `similar_many()` runs one product for the rows asked for.
+    """
+
+    def __init__(self, vocabulary, idf, vectors, neighbors, scores):
+        self.vocabulary = vocabulary
+        self._columns = {term: column for column, term in enumerate(vocabulary)}
+        self.idf = idf
+        self.vectors = vectors
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @classmethod
+    def build(cls, names, descriptions, k=5, max_features=2048, block_size=512,
+              precompute_limit=PRECOMPUTE_LIMIT):
+        documents = []
+        for name, description in zip(names, descriptions):
+            counts = {}
+            for term in terms(name) * NAME_WEIGHT + terms(description):
+                counts[term] = counts.get(term, 0) + 1
+            documents.append(counts)
+
+        document_frequency = {}
+        for counts in documents:
+            for term in counts:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        # Keep the most widespread terms; rarer ones are cut first when over the limit
+        size = len(documents)
+        max_features = min(max_features, max(256, MAX_VECTOR_CELLS // max(size, 1)))
+        kept = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:max_features]
+        vocabulary = sorted(kept)
+        columns = {term: column for column, term in enumerate(vocabulary)}
+        idf = np.array(
+            [np.log((1 + size) / (1 + document_frequency[term])) + 1 for term in vocabulary], dtype=np.float32
+        )
+
+        index = cls(vocabulary, idf, np.zeros((size, len(vocabulary)), dtype=np.float32), None, None)
+        for row, counts in enumerate(documents):
+            present = [(columns[term], count) for term, count in counts.items() if term in columns]
+            if present:
+                cols, tf = zip(*present)
+                index.vectors[row, list(cols)] = 1 + np.log(np.array(tf, dtype=np.float32))
+        index.vectors *= idf
+        _normalize(index.vectors)
+        if size <= precompute_limit:
+            index.neighbors, index.scores = index.top_k(
+                index.vectors, k, block_size=block_size, exclude=np.arange(size)
+            )
+        return index
+
+    def vectorize(self, texts):
+        """Normalized query vectors, one row per text."""
+        vectors = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in terms(text):
+                column = self._columns.get(term)
+                if column is not None:
+                    vectors[row, column] += 1
+        present = vectors > 0
+        vectors[present] = 1 + np.log(vectors[present])
+        vectors *= self.idf
+        return _normalize(vectors)
+
+    def top_k(self, queries, k, block_size=512, exclude=None):
+        """(rows, scores) of the `k` best matches per query vector, best first.
+
+        Slots without a positive match hold row -1. `exclude` gives one index
+        row per query that must not match it (the query tool itself).
+        """
+        size = len(self.vectors)
+        k = min(k, max(size - (exclude is not None), 0))
+        rows = np.full((len(queries), k), -1, dtype=np.int32)
+        scores = np.zeros((len(queries), k), dtype=np.float32)
+        if not k:
+            return rows, scores
+        for start in range(0, len(queries), block_size):
+            block = np.asarray(queries[start:start + block_size]) @ self.vectors.T
+            if exclude is not None:
+                block[np.arange(len(block)), exclude[start:start + len(block)]] = -1
+            best = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(block, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            best = np.take_along_axis(best, order, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            matched = best_scores > 0
+            rows[start:start + len(block)] = np.where(matched, best, -1)
+            scores[start:start + len(block)] = np.where(matched, best_scores, 0)
+        return rows, scores
+
+    def query(self, text, k=10):
+        """[(row, cosine similarity)] of the tools closest to free text, best first."""
+        rows, scores = self.top_k(self.vectorize([text]), k)
+        return [(int(row), float(score)) for row, score in zip(rows[0], scores[0]) if row >= 0]
+
+    def query_many(self, texts, k=10):
+        return self.top_k(self.vectorize(texts), k)
+
+    def similar_many(self, rows, k=5):
+        """[[(row, cosine similarity)] per catalog row in `rows`] of the closest other tools, best first."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.neighbors is not None:
+            neighbors, scores = self.neighbors[rows, :k], self.scores[rows, :k]
+        else:
+            neighbors, scores = self.top_k(self.vectors[rows], k, exclude=rows)
+        return [
+            [(int(other), float(score)) for other, score in zip(row_neighbors, row_scores) if other >= 0]
+            for row_neighbors, row_scores in zip(neighbors, scores)
+        ]
+
+    def similar(self, row, k=5):
+        return self.similar_many([row], k)[0]
+
+    def save(self, directory):
+        """Write the index to `directory` atomically (a complete directory or nothing)."""
+        parent = os.path.dirname(os.path.abspath(directory))
+        staging = None
+        try:
+            os.makedirs(parent, exist_ok=True)
+            staging = tempfile.mkdtemp(dir=parent, prefix=".similarity-")
+            with open(os.path.join(staging, "vocabulary.json"), "w", encoding="utf-8") as out:
+                json.dump(self.vocabulary, out)
+            for name in _FILES + _NEIGHBOR_FILES:
+                if getattr(self, name) is not None:
+                    np.save(os.path.join(staging, f"{name}.npy"), getattr(self, name))
+            os.rename(staging, directory)
+        except OSError:
+            # Another process got there first, or the disk is read-only: the index still works in memory
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory):
+        """Open a saved index; the arrays are memory-mapped read-only and shared through the page cache."""
+        with open(os.path.join(directory, "vocabulary.json"), encoding="utf-8") as source:
+            vocabulary = json.load(source)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in _FILES}
+        for name in _NEIGHBOR_FILES:
+            path = os.path.join(directory, f"{name}.npy")
+            arrays[name] = np.load(path, mmap_mode="r") if os.path.exists(path) else None
+        return cls(vocabulary, **arrays)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def load_or_build(names, descriptions, version=None, directory=None):
+    """The similarity index of one catalog version, from `directory/<version>` if saved there.
+
+    A freshly built index is saved for the next process, and indexes of other
+    catalog versions in `directory` are removed.
+    """
+    if directory is None or version is None:
+        return SimilarityIndex.build(names, descriptions)
+    name = f"{version}.v{FORMAT}"
+    path = os.path.join(directory, name)
+    if os.path.isdir(path):
+        try:
+            return SimilarityIndex.load(path)
+        except (OSError, ValueError):
+            # Saves are atomic, so an unreadable index is damaged rather than half-written
+            shutil.rmtree(path, ignore_errors=True)
+    index = SimilarityIndex.build(names, descriptions)
+    index.save(path)
+    try:
+        stale_names = os.listdir(directory)
+    except OSError:
+        # Nothing could be saved (e.g. a read-only catalog mount): serve the in-memory index
+        return index
+    for stale in stale_names:
+        if stale != name and not stale.startswith("."):
+            shutil.rmtree(os.path.join(directory, stale), ignore_errors=True)
+    return index
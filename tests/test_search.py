@@ -0,0 +1,30 @@
+from search import SearchIndex, tokenize
+
+NAMES = ["Graph Analysis", "Stichprobengröße", "Größe Prüfen", "Five Ys"]
+DESCRIPTIONS = [
+    "Plot data to spot trends.",
+    "Wie groß muss die Stichprobe sein?",
+    "Maße und Toleranzen prüfen.",
+    "Ask why five times.",
+]
+
+
+def test_tokenize_keeps_non_ascii_words():
+    assert tokenize("Größe der Stichprobe") == ["grösse", "der", "stichprobe"]
+    assert tokenize("naïve_test, café") == ["naïve", "test", "café"]
+
+
+def test_non_ascii_query_matches_whole_words_only():
+    index = SearchIndex(NAMES, DESCRIPTIONS)
+
+    assert index.search("größe") == [2]
+    assert index.search("GRÖSSE") == [2]
+    assert index.search("prüf") == [2]
+    assert index.search("stichprobengr") == [1]
+
+
+def test_ascii_ranking_unchanged():
+    index = SearchIndex(NAMES, DESCRIPTIONS)
+
+    assert index.search("five") == [3]
+    assert index.search("gr") == [0, 2, 1]
@@ -0,0 +1,40 @@
+import errno
+import os
+import shutil
+
+import similarity
+from catalog import CatalogLoader
+from similarity import load_or_build
+
+NAMES = ["Five Ys", "Fishbone Diagram", "Check Sheet"]
+DESCRIPTIONS = [
+    "Ask why five times to find the root cause.",
+    "Diagram of possible causes of a problem.",
+    "Form for collecting data where it happens.",
+]
+
+
+def _read_only(*args, **kwargs):
+    raise OSError(errno.EROFS, "Read-only file system")
+
+
+def test_load_or_build_falls_back_to_memory_on_read_only_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity.os, "makedirs", _read_only)
+    monkeypatch.setattr(similarity.tempfile, "mkdtemp", _read_only)
+    monkeypatch.setattr(similarity.os, "listdir", _read_only)
+
+    index = load_or_build(NAMES, DESCRIPTIONS, version="v1", directory=str(tmp_path / "similarity"))
+
+    assert [NAMES[row] for row, _ in index.query("root cause", k=1)] == ["Five Ys"]
+    assert not (tmp_path / "similarity").exists()
+
+
+def test_catalog_loader_starts_when_similarity_directory_is_unwritable(tmp_path, monkeypatch):
+    shutil.copy(os.path.join(os.path.dirname(__file__), os.pardir, "Data", "Tools_description.csv"),
+                tmp_path / "tools.csv")
+    monkeypatch.setattr(similarity.tempfile, "mkdtemp", _read_only)
+
+    loader = CatalogLoader(str(tmp_path / "tools.csv"), artifact=None)
+
+    assert len(loader.snapshot().frame) > 0
+    assert os.listdir(tmp_path / "similarity") == []
@@ -0,0 +1,161 @@
+"""Hot-path timing spans for toolshed.py.
+
+Set TOOLSHED_TIMING=1 to time every rerun. Each finished rerun is logged as
+one JSON line on the "toolshed.timing" logger (to stderr) and folded into
+process-wide totals; with TOOLSHED_METRICS_FILE set, the totals are also written in
+Prometheus text format for node_exporter's textfile collector.
+
+When timing is off, `span()` hands back one shared no-op context manager, so
+an instrumented section costs a method call and an attribute check.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("TOOLSHED_TIMING", "") not in ("", "0")
+METRICS_FILE = os.environ.get("TOOLSHED_METRICS_FILE")
+
+logger = logging.getLogger("toolshed.timing")
+if not logger.handlers:
+    # Streamlit configures only its own loggers; without this the JSON lines of
+    # TOOLSHED_TIMING or a ?debug=timing rerun would go nowhere
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def span(self, name):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self.timer
+
+    def __exit__(self, *exc):
+        self.timer.spans.append((self.name, time.perf_counter() - self.started))
+        return False
+
+
+class RerunTimer:
+    """Collects the spans of one script run."""
+
+    def __init__(self, enabled=ENABLED):
+        self.enabled = enabled
+        self.spans = []
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def span(self, name):
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def fragment(self, name, metrics=None):
+        """Span for an `st.fragment` body.
+
+        During a full run this is an ordinary span. Once the run has finished,
+        the fragment is rerunning on its own and is timed as a rerun of its own.
+        Use the value bound by `with ... as section` for nested spans so they
+        land in whichever timer is current.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        if not self.finished:
+            return _Span(self, name)
+        return self._fragment_rerun(name, metrics)
+
+    @contextmanager
+    def _fragment_rerun(self, name, metrics):
+        timer = RerunTimer(enabled=True)
+        with timer.span(name):
+            yield timer
+        timer.finish(metrics, total="fragment_rerun")
+
+    def finish(self, metrics=None, total="rerun"):
+        """Close the rerun: log it and add it to `metrics`. Returns the total seconds."""
+        self.finished = True
+        if not self.enabled:
+            return None
+        elapsed = time.perf_counter() - self.started
+        self.spans.append((total, elapsed))
+        logger.info(json.dumps({
+            "event": f"{total}_timing",
+            "spans_ms": {name: round(seconds * 1000, 3) for name, seconds in self.spans},
+        }))
+        if metrics is not None:
+            metrics.observe(self.spans)
+        return elapsed
+
+
+class TimingMetrics:
+    """Process-wide span totals, exported as a Prometheus textfile."""
+
+    def __init__(self, path=METRICS_FILE, write_interval=15.0):
+        self.path = path
+        self.write_interval = write_interval
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+
+    def observe(self, spans):
+        with self._lock:
+            for name, seconds in spans:
+                count, total = self._totals.get(name, (0, 0.0))
+                self._totals[name] = (count + 1, total + seconds)
+            # One session claims each write, so concurrent reruns never write the file together
+            due = bool(self.path) and time.monotonic() - self._last_write >= self.write_interval
+            if due:
+                self._last_write = time.monotonic()
+        if due:
+            self.write()
+
+    def render(self):
+        with self._lock:
+            totals = sorted(self._totals.items())
+        lines = [
+            "# HELP toolshed_span_seconds Time spent in each section of toolshed.py.",
+            "# TYPE toolshed_span_seconds summary",
+        ]
+        for name, (count, total) in totals:
+            lines.append(f'toolshed_span_seconds_sum{{span="{name}"}} {total:.6f}')
+            lines.append(f'toolshed_span_seconds_count{{span="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Atomically replace the textfile so the collector never reads a partial file.
+
+        Each write renders into its own temporary file next to the target."""
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(self.path)),
+            prefix=os.path.basename(self.path) + ".", suffix=".tmp", delete=False,
+        ) as metrics_file:
+            metrics_file.write(self.render())
+        try:
+            os.replace(metrics_file.name, self.path)
+        except OSError:
+            os.remove(metrics_file.name)
+            raise
@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
-import io
-from PIL import Image
 # Set wide layout
 st.set_page_config(page_title="PDCA Toolshed", layout="wide")
 
+# ✅ Per-rerun timing spans; on with TOOLSHED_TIMING=1 or for this rerun with ?debug=timing
+from timing import ENABLED as TIMING_ENABLED, RerunTimer, TimingMetrics
+
+show_timing = st.query_params.get("debug") == "timing"
+timer = RerunTimer(enabled=TIMING_ENABLED or show_timing)
+
 # === ONE TEAM color palette styles ===
 st.markdown("""
     <style>
@@ -28,36 +31,172 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# ✅ Logo is read once per process and shared by every session. Streamlit
+# serves the PNG bytes as-is; a PIL Image would be re-encoded on each rerun.
+@st.cache_resource
+def load_logo():
+    with open("resources/oneteam.png", "rb") as logo_file:
+        return logo_file.read()
+
+
 # Display ONE TEAM logo at top of sidebar
 with st.sidebar:
-    logo = Image.open("resources/oneteam.png")
-    st.image(logo, use_container_width=True)
+    st.image(load_logo(), use_container_width=True)
 
-import xlsxwriter
-from datetime import date
+import html
+from datetime import date, datetime
+
+import pandas as pd
+
+from analytics import CHARTS, load_rollup, render_chart, rollup_version
+from catalog import CatalogLoader, similar_tool_names
+from db import get_pool
+from exports import (
+    EXPORT_FORMATS,
+    ExportCache,
+    build_plan_rows,
+    plan_dataframe,
+    plan_hash,
+    render_export,
+)
+from feedback import ACCEPTED, BUSY, DUPLICATE, FeedbackQueue
+from forum import ForumStore
+from memory import catalog_memory_report, session_memory_report
+from projects import ProjectStore
+from recommend import load_cooccurrence, plan_key
+from repository import FileRepository
+from selection import codec_for, plan_params, read_plan_params, translate
+from usage import SEARCH, USAGE_COLUMNS, UsageRecorder, apply_usage
+from videos import VIDEO_TYPES, VIDEO_URL, VideoLibrary, VideoServer, catalog_videos
+
+# ✅ Slices of the shared catalog stay read-only views until someone writes to them.
+# Set here, in the app entry point, so importing catalog has no process-wide side effect.
+pd.set_option("mode.copy_on_write", True)
+
+
+# ✅ Load tool data and build the catalog index once per catalog version.
+# Edits to the CSV are picked up in the background; this rerun keeps its snapshot.
+@st.cache_resource
+def get_catalog_loader():
+    return CatalogLoader()
 
 
-# ✅ Load tool data
-@st.cache_data
 def load_data():
+    return get_catalog_loader().snapshot()
+
+with timer.span("catalog_load"):
+    catalog = load_data()
+tool_data = catalog.frame
+
+
+# ✅ Usage events are queued here and written to SQLite by a background thread
+@st.cache_resource
+def get_usage_recorder():
+    return UsageRecorder()
+
+usage_recorder = get_usage_recorder()
+
+
+@st.cache_data(ttl=30)
+def current_rollup_version():
+    # ✅ Sample the rollup version at most every 30s so busy periods don't redraw charts on every batch
+    return rollup_version()
+
+
+@st.cache_data(max_entries=2)
+def recorded_tool_usage(version):
+    # ✅ Per-tool counts are read from the aggregate table once per rollup version, not per rerun
+    return usage_recorder.tool_usage()
+
+
+# ✅ Saved plans live in SQLite behind a connection pool shared by all sessions
+@st.cache_resource
+def get_project_store():
+    return ProjectStore(get_pool())
+
+
+# ✅ "Teams who picked X also used Y": tool co-occurrence over saved and exported plans,
+# built once per process and then updated as plans are saved or exported. Each plan
+# counts once, under its owner and name, with the tools it was last saved or exported with
+@st.cache_resource
+def get_recommender():
+    matrix = load_cooccurrence(get_project_store().pool)
+
+    def update_exported(plans):
+        for key, tools in plans:
+            matrix.set_plan(key, tools)
+
+    get_usage_recorder().plan_listeners.append(update_exported)
+    return matrix
+
+
+# ✅ Rendered exports are shared by every session in this process
+@st.cache_resource
+def get_export_cache():
+    return ExportCache()
+
+
+# ✅ Discussion threads share the app database and its connection pool
+@st.cache_resource
+def get_forum_store():
+    return ForumStore(get_pool())
+
+
+# ✅ Uploaded files are stored once per content hash under Data/repository
+@st.cache_resource
+def get_file_repository():
+    return FileRepository(get_pool())
+
+
+# ✅ Project videos and the range-request server that plays them and serves repository downloads
+@st.cache_resource
+def get_video_library():
+    return VideoLibrary(get_pool())
+
+
+@st.cache_resource
+def get_video_server():
+    if VIDEO_URL is None:
+        return None
     try:
-        return pd.read_csv("Data/Tools_description.csv")
-    except FileNotFoundError:
-        return pd.read_csv("Tools_description.csv")
+        return VideoServer(get_video_library(), files=get_file_repository())
+    except OSError:
+        return None
+
 
-tool_data = load_data()
+@st.cache_resource(max_entries=2)
+def get_catalog_videos(version, _frame):
+    return catalog_videos(_frame)
+
+
+# ✅ Feedback is queued and written in batches by a background thread
+@st.cache_resource
+def get_feedback_queue():
+    return FeedbackQueue(get_pool())
+
+
+@st.cache_resource
+def get_timing_metrics():
+    return TimingMetrics()
 
-# ✅ Fix column names
-tool_data = tool_data.rename(columns={
-    "Unnamed: 3": "More Info",
-    "Unnamed: 4": "Video1",
-    "Unnamed: 5": "Video2",
-    "Unnamed: 6": "Video3"
-})
 
 # ✅ Sidebar: Project Details & PDCA Selection
 st.sidebar.title("Project Details")
 
+# ✅ Tool selections are one bitset over the catalog's tool slots, kept with the catalog
+# version it refers to. A shared plan URL restores selection and project fields in one decode.
+codec = catalog.selections
+if "selection" not in st.session_state:
+    bits, fields, stale_link = read_plan_params(st.query_params, codec)
+    st.session_state.update(fields)
+    st.session_state["selection"] = (catalog.version, bits or 0)
+    if stale_link:
+        st.sidebar.warning("This plan link was made for an older tool catalog; its tools could not be restored.")
+selection_version, selection_bits = st.session_state["selection"]
+if selection_version != catalog.version:
+    # The catalog was reloaded: move the selection to the new slots by tool name
+    selection_bits = translate(selection_bits, codec_for(selection_version), codec)
+
 # ✅ Store Project Name & Owner in session state
 if "project_name" not in st.session_state:
     st.session_state["project_name"] = ""
@@ -76,26 +215,54 @@ created_date = st.session_state["created_date"]
 st.sidebar.markdown("---")  # separator line
 st.sidebar.header("Select Tools for PDCA Phases")
 
-# ✅ Ensure session state is initialized properly
-if "selected_tools" not in st.session_state:
-    st.session_state.selected_tools = {
-        "Plan": [],
-        "Do": [],
-        "Check": [],
-        "Act": []
-    }
-
 # ✅ Unified PDCA Selection (Used in Both Toolshed & Project Plan Tabs)
-for phase in ["Plan", "Do", "Check", "Act"]:
-    selected_temp = st.sidebar.multiselect(
-        f"{phase} Tools:",
-        options=tool_data[tool_data['PDCA Category'] == phase]['Tool Name'].tolist(),
-        default=st.session_state.selected_tools.get(phase, [])
-    )
+recommender = get_recommender()
+with timer.span("sidebar"):
+    for phase in ["Plan", "Do", "Check", "Act"]:
+        selected_temp = st.sidebar.multiselect(
+            f"{phase} Tools:",
+            options=catalog.phase_options[phase],
+            default=codec.tools(selection_bits & codec.mask(phase))
+        )
 
-    # ✅ Update session state if selection changes
-    if selected_temp != st.session_state.selected_tools[phase]:
-        st.session_state.selected_tools[phase] = selected_temp
+        # ✅ Diff this phase bitwise: XOR finds a change, AND NOT the newly added tools
+        phase_bits = codec.encode_phase(phase, selected_temp)
+        previous_bits = selection_bits & codec.mask(phase)
+        if phase_bits != previous_bits:
+            usage_recorder.record_selection(phase, (), codec.tools(phase_bits & ~previous_bits))
+            selection_bits ^= previous_bits ^ phase_bits
+
+        # ✅ Suggest tools for this phase from plans that share the current selection
+        suggestions = {}
+        for tool, count, because in recommender.recommend(
+            codec.tools(selection_bits), catalog.phase_options[phase], k=3
+        ):
+            suggestions.setdefault(because, []).append(f"**{tool}** ({count})")
+        if suggestions:
+            st.sidebar.caption("  \n".join(
+                f"💡 Teams who picked {because} also used {', '.join(tools)}"
+                for because, tools in suggestions.items()
+            ))
+
+st.session_state["selection"] = (catalog.version, selection_bits)
+selected_tools = codec.decode(selection_bits)
+
+# ✅ Keep the address bar in sync so the URL shares this plan; untouched params (e.g. debug) are kept
+shared = plan_params(codec, selection_bits, st.session_state) if selection_bits else {}
+for param in ("tools", "catalog", "project", "owner", "created"):
+    if param not in shared and param in st.query_params:
+        del st.query_params[param]
+for param, value in shared.items():
+    if st.query_params.get(param) != value:
+        st.query_params[param] = value
+
+# ✅ Opt-in memory report (?debug=memory) for sizing pods
+if st.query_params.get("debug") == "memory":
+    with st.sidebar.expander("Memory report"):
+        st.json({
+            "catalog": catalog_memory_report(catalog),
+            "session": session_memory_report(st.session_state.to_dict()),
+        })
 
 # ✅ Define PDCA colors (matching your screenshot)
 pdca_colors = {
@@ -113,13 +280,10 @@ tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
 ])
 
 # === Toolshed Tab ===
-with tab1:
+with tab1, timer.span("tab.toolshed"):
     st.subheader("Toolshed")
     st.write("Select tools from each PDCA phase in the sidebar. They will appear in the corresponding toolbox below:")
 
-    # ✅ Retrieve selected tools from session state
-    selected_tools = st.session_state.selected_tools
-
     # ✅ Create PDCA toolboxes with colors
     toolbox_cols = st.columns(4)
     for idx, phase in enumerate(["Plan", "Do", "Check", "Act"]):
@@ -165,194 +329,551 @@ with tab1:
                 <ul style="list-style-type: none; padding: 0;">
                 """
                 for tool in tools:
-                    toolbox_html += f'<li style="padding: 5px; border-bottom: 1px solid {box_color};">✅ {tool}</li>'
+                    toolbox_html += f'<li style="padding: 5px; border-bottom: 1px solid {box_color};">✅ {html.escape(tool)}</li>'
                 toolbox_html += "</ul></div>"
 
                 st.markdown(toolbox_html, unsafe_allow_html=True)
 
+# === Paging ===
+def keyset_pager(key, cursor):
+    """Previous/next buttons over a stack of keyset cursors kept in session state."""
+    pages = st.session_state.setdefault(key, [None])
+    prev_col, next_col = st.columns(2)
+    prev_col.button("← Previous", key=f"{key}_prev", disabled=len(pages) == 1, on_click=pages.pop)
+    next_col.button("Next →", key=f"{key}_next", disabled=cursor is None, on_click=pages.append, args=(cursor,))
+
+
 # === Tool Dictionary Tab ===
-with tab2:
-    st.subheader("Tool Dictionary")
-    
-    # Search box
-    query = st.text_input("🔍 Search tools:", "")
+DICTIONARY_PAGE_SIZE = 50
+# Keyword searches rank at most this many tools
+DICTIONARY_MAX_RESULTS = 1000
 
-    # ✅ Case-insensitive filtering
-    if query:
-        mask = tool_data['Tool Name'].str.contains(query, case=False, na=False) | tool_data['Description'].str.contains(query, case=False, na=False)
-        filtered_data = tool_data[mask].copy()
-    else:
-        filtered_data = tool_data.copy()
-
-    # ✅ Convert 'Tool Name' into clickable links
-    if 'More Info' in filtered_data.columns:
-        filtered_data['Tool Name'] = filtered_data.apply(
-            lambda row: f"<a href='{row['More Info']}' target='_blank'>{row['Tool Name']}</a>" 
-                        if pd.notna(row['More Info']) and str(row['More Info']).strip() != "" 
-                        else row['Tool Name'],
-            axis=1
-        )
 
-    # ✅ Display table with same width as the search box
-    dict_display = filtered_data[['PDCA Category', 'Tool Name', 'Description']].copy()
-    dict_display.rename(columns={'PDCA Category': 'Phase'}, inplace=True)
+@st.cache_data(max_entries=256)
+def page_similar_tools(version, rows, _catalog):
+    # ✅ Neighbours of the shown rows only: one similarity product per page, cached per catalog version
+    return similar_tool_names(_catalog, list(rows))
 
-    if dict_display.empty:
-        st.warning("⚠️ No tools found. Try a different search term.")
-    else:
-        st.container()  # Wrap table inside a container
-        st.dataframe(dict_display, use_container_width=True)
 
-# === Video Library Tab ===
-with tab3:
-    st.subheader("🎥 Video Library - Work in Progress 🚧")
+# ✅ Each tab with its own widgets is a fragment: typing a search, saving a plan or
+# writing feedback reruns only that tab. Sidebar selections still rerun the app:
+# a fragment cannot call st.sidebar or put widgets in containers made outside it,
+# so the sidebar, the toolboxes and the plan table (with its buttons) cannot share one.
+@st.fragment
+def tool_dictionary_tab():
+    with timer.fragment("tab.tool_dictionary", get_timing_metrics()):
+        st.subheader("Tool Dictionary")
     
-    # Work in Progress message with an icon
-    st.markdown(
-        """
-        🚀 **Coming Soon!** This is where you will be able to **upload a short video of your project**.  
-        
-        🎯 **What to Include in Your Video:**
-        - 🎬 A brief **introduction to your project**  
-        - 🛠️ The **PDCA tools** you used  
-        - 📊 **How successful it was** and **what you learned**  
-        - 💡 **Tips for others** who may want to try similar tools  
-
-        🔍 You will also be able to **search videos by PDCA category and keyword**.  
-
-        🏗️ **Just watch this space!** 🎥
-        """,
-        unsafe_allow_html=True
-    )
-    # === Project Plan Tab ===
-with tab4:
-    st.subheader("Project Plan")
+        # Search box
+        query = st.text_input("🔍 Search tools:", "")
+        mode = st.radio("Match", ["Keywords", "Similar meaning"], horizontal=True, key="dictionary_mode",
+                        help="Similar meaning ranks tools by TF-IDF similarity, e.g. 'root cause' finds Five Ys")
+
+        if query and query != st.session_state.get("last_search"):
+            usage_recorder.record(SEARCH, query=query)
+            st.session_state["last_search"] = query
+
+        # ✅ Ranked prefix search or TF-IDF vectors; results only select rows of the display table
+        if query and mode == "Similar meaning":
+            rows = [row for row, _ in catalog.similarity.query(query, k=15)]
+        elif query:
+            rows = catalog.search.search(query, limit=DICTIONARY_MAX_RESULTS)
+        else:
+            rows = range(len(catalog.display))
+        dict_display = catalog.display.iloc[rows] if query else catalog.display
+
+        if (query, mode) != st.session_state.get("dictionary_last_search"):
+            st.session_state["dictionary_last_search"] = (query, mode)
+            st.session_state["dictionary_pages"] = [None]
+
+        if dict_display.empty:
+            st.warning("⚠️ No tools found. Try a different search term.")
+        else:
+            # ✅ One page of rows at a time; cursors are row offsets into the results
+            offset = st.session_state.setdefault("dictionary_pages", [None])[-1] or 0
+            page = dict_display.iloc[offset:offset + DICTIONARY_PAGE_SIZE]
+            page_rows = tuple(rows[offset:offset + DICTIONARY_PAGE_SIZE])
+            usage = apply_usage(catalog.frame.iloc[list(page_rows)], recorded_tool_usage(current_rollup_version()))
+            page = page.assign(**{column: usage[column].to_numpy() for column in USAGE_COLUMNS},
+                               **{"Similar Tools": page_similar_tools(catalog.version, page_rows, catalog)})
+            st.container()  # Wrap table inside a container
+            st.dataframe(page, use_container_width=True)
+            end = offset + len(page)
+            st.caption(f"Tools {offset + 1}–{end} of {len(dict_display)}")
+            keyset_pager("dictionary_pages", end if end < len(dict_display) else None)
 
-    # ✅ Retrieve project details from session state
-    project_name = st.session_state["project_name"]
-    project_owner = st.session_state["project_owner"]
-    created_date = st.session_state.get("created_date", date.today().strftime("%d-%m-%Y"))
 
-    # ✅ Display Project Details
-    st.markdown(f"**Project Name:** {project_name} &nbsp;&nbsp; **Owner:** {project_owner} &nbsp;&nbsp; **Created:** {created_date}", unsafe_allow_html=True)
-    st.write("")  # Empty line for spacing
+with tab2:
+    tool_dictionary_tab()
 
-    # ✅ Introductory text for the project plan table
-    st.write("The table below outlines the selected tools as tasks in your PDCA project plan.")
+# === Video Library Tab ===
+def upload_video():
+    upload = st.session_state["video_upload"]
+    title = st.session_state["video_title"].strip()
+    if upload is None or not title:
+        st.session_state["video_uploaded"] = False
+        return
+    upload.seek(0)
+    get_video_library().add(
+        upload,
+        upload.name,
+        title,
+        uploader=st.session_state["project_owner"] or "Anonymous",
+        phase=st.session_state["video_phase"] or None,
+        tools=st.session_state["video_tools"],
+        keywords=st.session_state["video_keywords"].strip(),
+        description=st.session_state["video_description"].strip(),
+    )
+    st.session_state["video_uploaded"] = True
 
-    # ✅ Add missing tool descriptions
-    all_tasks = []
-    for phase in ["Plan", "Do", "Check", "Act"]:
-        for tool in st.session_state.selected_tools[phase]:
-            desc = tool_data.loc[tool_data["Tool Name"] == tool, "Description"].values
-            desc_text = desc[0] if len(desc) > 0 else ""
-            all_tasks.append({"PDCA Phase": phase, "Task Name": tool, "Description": desc_text})
-
-    project_plan_df = pd.DataFrame(all_tasks)
-
-    # ✅ Display project plan table
-    st.dataframe(project_plan_df, use_container_width=True)
-
-    # ✅ Download buttons
-    st.markdown("**Download Project Plan:**")
-    dcol1, dcol2, dcol3, dcol4 = st.columns(4)
-
-    # ✅ CSV Download
-    csv_data = project_plan_df.to_csv(index=False, encoding='utf-8-sig')
-    dcol1.download_button("Download CSV", data=csv_data, file_name="Project_Plan.csv", mime="text/csv")
-    # ✅ TXT Download
-    text_data = project_plan_df.to_csv(index=False, sep='\t')
-    dcol3.download_button("Download TXT", data=text_data, file_name="Project_Plan.txt", mime="text/plain")
-
-    # ✅ Excel Download using `xlsxwriter`
-try:
-    excel_output = io.BytesIO()
-    with pd.ExcelWriter(excel_output, engine='xlsxwriter') as writer:
-        project_plan_df.to_excel(writer, index=False, sheet_name="Project Plan")
-        excel_data = excel_output.getvalue()
-    dcol2.download_button("Download Excel", data=excel_data, file_name="Project_Plan.xlsx", mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-except Exception as e:
-        dcol2.write("⚠️ Excel export not available")
-    
-try:
-    from fpdf import FPDF
-except ImportError:
-    FPDF = None
-
-if FPDF is not None:
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
-
-    # ✅ Title Section
-    pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, f"Project Plan - {st.session_state.get('project_name', 'Untitled')}", ln=1, align='C')
-    pdf.set_font("Arial", '', 12)
-    pdf.cell(0, 10, f"Owner: {st.session_state.get('project_owner', 'N/A')}    Created: {st.session_state.get('created_date', 'N/A')}", ln=1, align='C')
-    pdf.ln(10)
-
-    # ✅ Write tasks to PDF
-    if not project_plan_df.empty:
-        for _, row in project_plan_df.iterrows():
-            pdf.set_font("Arial", 'B', 14)
-            pdf.cell(0, 8, f"{row['PDCA Phase']} Phase", ln=1)
-            pdf.set_font("Arial", '', 12)
-
-            # ✅ Handle encoding issues
-            task_name = row['Task Name'] if row['Task Name'] else "Unnamed Task"
-            description = row['Description'] if row['Description'] else "No Description Available"
-
-            def clean_text(text):
-                return ''.join(c for c in text if ord(c) < 128)  # Keep only ASCII characters
-
-            task_name = clean_text(task_name)
-            description = clean_text(description)
-
-            pdf.cell(0, 6, f"{task_name} - {description}", ln=1)
-            pdf.cell(0, 6, "Start Date: ______    Completion Date: ______", ln=1)
-            pdf.ln(4)
 
-    else:
-        pdf.set_font("Arial", 'I', 12)
-        pdf.cell(0, 10, "No tasks selected for this project plan.", ln=1, align='C')
+@st.fragment
+def video_library_tab():
+    with timer.fragment("tab.video_library", get_timing_metrics()):
+        st.subheader("🎥 Video Library")
+        library = get_video_library()
+        all_tools = catalog.all_tools
+
+        with st.expander("⬆️ Upload a project video"):
+            st.markdown(
+                """
+                🎯 **What to Include in Your Video:**
+                - 🎬 A brief **introduction to your project**  
+                - 🛠️ The **PDCA tools** you used  
+                - 📊 **How successful it was** and **what you learned**  
+                - 💡 **Tips for others** who may want to try similar tools  
+                """
+            )
+            with st.form("video_upload_form", clear_on_submit=True):
+                st.file_uploader("Video", type=VIDEO_TYPES, key="video_upload")
+                st.text_input("Title", key="video_title")
+                st.selectbox("PDCA phase", options=[""] + ["Plan", "Do", "Check", "Act"], key="video_phase",
+                             format_func=lambda phase: phase or "Any phase")
+                st.multiselect("Tools used", options=all_tools, key="video_tools")
+                st.text_input("Keywords", key="video_keywords")
+                st.text_area("Description", key="video_description")
+                st.form_submit_button("Upload", on_click=upload_video)
+            uploaded = st.session_state.pop("video_uploaded", None)
+            if uploaded:
+                st.success("Video uploaded.")
+            elif uploaded is False:
+                st.warning("Choose a video file and give it a title.")
+
+        # 🔍 Search videos by PDCA category and keyword
+        query_col, phase_col, tool_col = st.columns([2, 1, 1])
+        query = query_col.text_input("🔍 Search videos:", "")
+        phase = phase_col.selectbox("Phase", options=[""] + ["Plan", "Do", "Check", "Act"], key="video_filter_phase",
+                                    format_func=lambda phase: phase or "All phases")
+        tool = tool_col.selectbox("Tool", options=("",) + all_tools, key="video_filter_tool",
+                                  format_func=lambda tool: tool or "All tools")
+
+        videos = library.search(query, phase=phase or None, tool=tool or None)
+        if videos:
+            labels = {
+                row[0]: f"{row[1]} — {row[3]} · {row[2] or 'Any phase'} · "
+                        f"{datetime.fromtimestamp(row[6]).strftime('%d-%m-%Y')}"
+                for row in videos
+            }
+            chosen = st.radio("Project videos", options=list(labels), format_func=labels.get)
+            video = next(row for row in videos if row[0] == chosen)
+            # ✅ The browser streams byte ranges from the video server; nothing is read into this session
+            server = get_video_server()
+            if server is None:
+                st.warning("⚠️ Video playback not available: " + (
+                    "set TOOLSHED_VIDEO_URL to the address browsers use to reach the video server"
+                    if VIDEO_URL is None else "the video server could not start"))
+            else:
+                st.video(server.url(video[7]), format=video[9])
+            if video[4]:
+                st.write(video[4])
+            tools = library.tools(video[0])
+            if tools:
+                st.caption("Tools: " + ", ".join(tools))
+        else:
+            st.info("No project videos found. Upload one above!")
+
+        # ✅ Tool videos linked from the catalog's Video1-Video3 columns
+        linked = get_catalog_videos(catalog.version, catalog.frame)
+        if linked:
+            rows = catalog.search.search(query) if query else sorted(linked)
+            frame = catalog.frame
+            shown = 0
+            for position in rows:
+                links = linked.get(position)
+                if not links or (phase and frame["PDCA Category"].iat[position] != phase):
+                    continue
+                if tool and frame["Tool Name"].iat[position] != tool:
+                    continue
+                if shown == 0:
+                    st.markdown("**Tool videos from the catalog:**")
+                with st.expander(f"{frame['Tool Name'].iat[position]} ({frame['PDCA Category'].iat[position]})"):
+                    for link in links:
+                        st.video(link)
+                shown += 1
+                if shown == 10:
+                    break
 
-    # ✅ Generate PDF Download Button
-    pdf_bytes = pdf.output(dest='S').encode('latin-1')
-    dcol4.download_button("Download PDF", data=pdf_bytes, file_name="Project_Plan.pdf", mime="application/pdf")
 
-else:
-    dcol4.write("⚠️ PDF export not available (FPDF not installed)")
+with tab3:
+    video_library_tab()
+
+# === Project Plan Tab ===
+@st.fragment
+def project_plan_tab():
+    with timer.fragment("tab.project_plan", get_timing_metrics()) as section:
+        st.subheader("Project Plan")
+
+        # ✅ Retrieve project details from session state
+        project_name = st.session_state["project_name"]
+        project_owner = st.session_state["project_owner"]
+        created_date = st.session_state.get("created_date", date.today().strftime("%d-%m-%Y"))
+
+        # ✅ Display Project Details
+        # ✅ Names and dates can come from a shared plan URL: escape them before rendering as HTML
+        st.markdown(f"**Project Name:** {html.escape(project_name)} &nbsp;&nbsp; **Owner:** {html.escape(project_owner)} &nbsp;&nbsp; **Created:** {html.escape(created_date)}", unsafe_allow_html=True)
+        st.write("")  # Empty line for spacing
+
+        # ✅ Save the plan or reopen a saved one without replaying sidebar selections
+        project_store = get_project_store()
+        with st.expander("💾 Saved plans"):
+            if st.button("Save plan", key="save_plan", disabled=not project_name):
+                project_store.save(project_name, project_owner, created_date, selected_tools)
+                get_recommender().set_plan(plan_key(project_owner, project_name), selected_tools)
+                st.success(f"Saved '{project_name}'.")
+
+            saved_plans = project_store.list(owner=project_owner or None)
+            if saved_plans:
+                chosen = st.selectbox(
+                    "Saved plans" + (f" for {project_owner}" if project_owner else ""),
+                    options=saved_plans,
+                    format_func=lambda plan: f"{plan[1]} — {plan[0] or 'no owner'} ({plan[2]})",
+                )
+                if st.button("Open plan", key="open_plan"):
+                    plan = project_store.load(chosen[0], chosen[1])
+                    if plan is not None:
+                        st.session_state["project_name"] = plan["project_name"]
+                        st.session_state["project_owner"] = plan["project_owner"]
+                        st.session_state["created_date"] = plan["created_date"]
+                        # Tools that are no longer in the catalog have no slot and are dropped
+                        st.session_state["selection"] = (catalog.version, codec.encode(plan["selected_tools"]))
+                        st.rerun()
+            else:
+                st.caption("No saved plans yet.")
+
+        # ✅ Introductory text for the project plan table
+        st.write("The table below outlines the selected tools as tasks in your PDCA project plan.")
+
+        # ✅ Add missing tool descriptions
+        all_tasks = build_plan_rows(selected_tools, lambda tool: catalog.descriptions.get(tool, ""))
+        project_plan_df = plan_dataframe(all_tasks)
+
+        # ✅ Display project plan table
+        st.dataframe(project_plan_df, use_container_width=True)
+
+        # ✅ Download buttons: each format is rendered only when requested and
+        # cached by plan content and catalog version, so identical plans are served from memory
+        st.markdown("**Download Project Plan:**")
+        dcol1, dcol2, dcol3, dcol4 = st.columns(4)
+
+        export_cache = get_export_cache()
+        current_plan_hash = plan_hash(project_name, project_owner, created_date, selected_tools)
+        export_key = plan_hash(project_name, project_owner, created_date, selected_tools, catalog.version)
+
+        for dcol, fmt in zip([dcol1, dcol2, dcol3, dcol4], ["csv", "excel", "txt", "pdf"]):
+            label, file_name, mime = EXPORT_FORMATS[fmt]
+            cache_key = f"{export_key}:{fmt}"
+            export_data = export_cache.get(cache_key)
+            slot = dcol.empty()
+            if export_data is None and slot.button(label.replace("Download", "Prepare"), key=f"prepare_{fmt}"):
+                try:
+                    with section.span(f"export.{fmt}"):
+                        export_data = export_cache.get_or_render(
+                            cache_key,
+                            lambda: render_export(fmt, project_plan_df, project_name, project_owner, created_date),
+                        )
+                except ImportError:
+                    slot.write("⚠️ PDF export not available (FPDF not installed)")
+                except Exception:
+                    slot.write(f"⚠️ {label.replace('Download ', '')} export not available")
+            if export_data is not None:
+                if slot.download_button(label, data=export_data, file_name=file_name, mime=mime, key=f"download_{fmt}"):
+                    usage_recorder.record_export(fmt, current_plan_hash, selected_tools,
+                                                 plan_key(project_owner, project_name, current_plan_hash))
+
 
-    import streamlit as st
-from PIL import Image
+with tab4:
+    project_plan_tab()
 
 # === Repository ===
+# Files up to this size can be downloaded through the session when the range server is not running
+INLINE_DOWNLOAD_LIMIT = 20 * 1024 * 1024
+
+
+def upload_repository_files():
+    repository = get_file_repository()
+    uploads = st.session_state["repo_uploads"] or []
+    for upload in uploads:
+        upload.seek(0)
+        repository.add(
+            upload,
+            upload.name,
+            uploader=st.session_state["project_owner"] or "Anonymous",
+            phase=st.session_state["repo_phase"] or None,
+            tools=st.session_state["repo_tools"],
+            description=st.session_state["repo_description"].strip(),
+        )
+    st.session_state["repo_uploaded"] = len(uploads)
+    st.session_state["repo_pages"] = [None]
+
+
+def file_size(size):
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+@st.fragment
+def repository_tab():
+    with timer.fragment("tab.repository", get_timing_metrics()):
+        # Tab 5: Repository
+        st.title("📂 CI Repository")
+        st.write("Upload and share useful CI files and presentations with other users.")
+        repository = get_file_repository()
+        all_tools = catalog.all_tools
+
+        with st.expander("⬆️ Upload files"):
+            with st.form("repo_upload", clear_on_submit=True):
+                st.file_uploader("Files", accept_multiple_files=True, key="repo_uploads")
+                st.selectbox("PDCA phase", options=[""] + ["Plan", "Do", "Check", "Act"], key="repo_phase",
+                             format_func=lambda phase: phase or "Any phase")
+                st.multiselect("Tools", options=all_tools, key="repo_tools")
+                st.text_input("Description", key="repo_description")
+                st.form_submit_button("Upload", on_click=upload_repository_files)
+            uploaded = st.session_state.pop("repo_uploaded", None)
+            if uploaded:
+                st.success(f"Uploaded {uploaded} file(s).")
+
+        # ✅ Filters map onto indexed columns; pages are keyset cursors on (uploaded, id)
+        phase_col, tool_col, uploader_col = st.columns(3)
+        phase = phase_col.selectbox("Phase", options=[""] + ["Plan", "Do", "Check", "Act"],
+                                    format_func=lambda phase: phase or "All phases")
+        tool = tool_col.selectbox("Tool", options=("",) + all_tools, format_func=lambda tool: tool or "All tools")
+        uploader = uploader_col.selectbox("Uploaded by", options=[""] + repository.uploaders(),
+                                          format_func=lambda uploader: uploader or "Anyone")
+        filters = (phase, tool, uploader)
+        if filters != st.session_state.get("repo_last_filters"):
+            st.session_state["repo_last_filters"] = filters
+            st.session_state["repo_pages"] = [None]
+
+        server = get_video_server()
+        files, cursor = repository.files(phase=phase or None, tool=tool or None, uploader=uploader or None,
+                                         before=st.session_state.setdefault("repo_pages", [None])[-1])
+        if not files:
+            st.info("No files yet. Upload the first one above!")
+        for file_id, name, file_phase, file_uploader, description, uploaded_at, sha256, size, mime, has_thumbnail in files:
+            with st.container(border=True):
+                preview_col, info_col, download_col = st.columns([1, 4, 2])
+                if has_thumbnail:
+                    preview_col.image(repository.thumbnail_path(sha256), use_container_width=True)
+                info_col.markdown(f"**{name}** · {file_size(size)}  \n"
+                                  f"{file_phase or 'Any phase'} · {file_uploader} · "
+                                  f"{datetime.fromtimestamp(uploaded_at).strftime('%d-%m-%Y')}")
+                if description:
+                    info_col.caption(description)
+                # ✅ The browser downloads straight from the range server, streamed from a memory-mapped blob;
+                # without the server only small files are read into this session, on request
+                if server is not None:
+                    download_col.link_button("Download", server.file_url(sha256, name))
+                elif size <= INLINE_DOWNLOAD_LIMIT:
+                    slot = download_col.empty()
+                    if slot.button("Prepare download", key=f"repo_prepare_{file_id}"):
+                        with repository.open(sha256) as blob:
+                            slot.download_button("Download", data=blob, file_name=name, mime=mime,
+                                                 key=f"repo_download_{file_id}")
+                else:
+                    download_col.caption("Download unavailable (video server not configured or not running)")
+        keyset_pager("repo_pages", cursor)
+
+
 with tab5:
-    # Tab 5: Repository
-    st.title("📂 CI Repository (Coming Soon)")
-    st.write("Upload and share useful CI files and presentations with other users.")
-    st.info("This feature is a work in progress and will be available soon!")
+    repository_tab()
 
 # === Analytics ===
-with tab6:
+@st.cache_data(max_entries=64)
+def analytics_chart(chart, version):
+    # ✅ Cached per (rollup version, chart): a figure is drawn once per batch of new events
+    return render_chart(chart, load_rollup(chart))
+
+
+with tab6, timer.span("tab.analytics"):
 # Tab 6: Analytics
-    st.title("📊 Analytics (Coming Soon)")
+    st.title("📊 Analytics")
     st.write("Track tool usage, analyze effectiveness, and get recommendations based on ML models.")
-    st.info("Future updates will include graphs and AI-driven recommendations!")
+
+    version = current_rollup_version()
+    if version == 0:
+        st.info("No usage recorded yet. Charts appear once tools are selected, searched or exported.")
+    else:
+        for chart, title in CHARTS.items():
+            png = analytics_chart(chart, version)
+            if png is None:
+                st.caption(f"{title}: no data yet")
+            else:
+                st.image(png, use_container_width=True)
 
 
 # === Discussion ===
+@st.cache_data(max_entries=256)
+def forum_search(query, before, version):
+    # ✅ Cached per forum version: repeated searches and page flips skip FTS until someone posts
+    return get_forum_store().search(query, before=before)
+
+
+def forum_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%d-%m-%Y %H:%M")
+
+
+def post_forum_reply(thread_id):
+    reply = st.session_state["forum_reply"].strip()
+    if reply:
+        get_forum_store().reply(thread_id, st.session_state["project_owner"] or "Anonymous", reply)
+
+
+def post_forum_thread():
+    title = st.session_state["forum_title"].strip()
+    body = st.session_state["forum_body"].strip()
+    if title and body:
+        get_forum_store().create_thread(title, st.session_state["project_owner"] or "Anonymous", body,
+                                        st.session_state["forum_tools"])
+        st.session_state["forum_thread_pages"] = [None]
+
+
+@st.fragment
+def discussion_tab():
+    with timer.fragment("tab.discussion", get_timing_metrics()):
+        # Tab 7: Discussions
+        st.title("💬 CI Discussions")
+        st.write("A searchable forum for discussing CI tools, sharing tips, successes, and learning from failures.")
+        forum = get_forum_store()
+
+        query = st.text_input("Search discussions...")
+        if query != st.session_state.get("forum_last_query"):
+            st.session_state["forum_last_query"] = query
+            st.session_state["forum_search_pages"] = [None]
+
+        if query:
+            hits, cursor = forum_search(query, st.session_state.setdefault("forum_search_pages", [None])[-1],
+                                        forum.version())
+            if not hits:
+                st.warning("⚠️ No posts found. Try a different search term.")
+            for post_id, thread_id, title, post_author, snippet, created in hits:
+                st.markdown(f"**{title}** · {post_author} · {forum_time(created)}  \n{snippet}")
+            keyset_pager("forum_search_pages", cursor)
+            return
+
+        # ✅ Thread list, optionally narrowed to threads tagged with one catalog tool
+        all_tools = catalog.all_tools
+        tag = st.selectbox("Filter by tool", options=("",) + all_tools,
+                           format_func=lambda tool: tool or "All tools")
+        if tag != st.session_state.get("forum_last_tag"):
+            st.session_state["forum_last_tag"] = tag
+            st.session_state["forum_thread_pages"] = [None]
+
+        threads, cursor = forum.threads(tool=tag or None,
+                                        after=st.session_state.setdefault("forum_thread_pages", [None])[-1])
+        if threads:
+            labels = {
+                row_id: f"{title} — {thread_author} · {replies} replies · {forum_time(last_post)}"
+                for row_id, title, thread_author, last_post, replies in threads
+            }
+            thread_id = st.radio("Threads", options=list(labels), format_func=labels.get)
+            keyset_pager("forum_thread_pages", cursor)
+            if thread_id != st.session_state.get("forum_last_thread"):
+                st.session_state["forum_last_thread"] = thread_id
+                st.session_state["forum_post_pages"] = [None]
+
+            thread = forum.thread(thread_id)
+            if thread is not None:
+                st.subheader(thread[1])
+                if thread[6]:
+                    st.caption("Tools: " + ", ".join(thread[6]))
+                posts, post_cursor = forum.posts(thread_id, after=st.session_state["forum_post_pages"][-1])
+                for _, post_author, body, created in posts:
+                    with st.container(border=True):
+                        st.caption(f"{post_author} · {forum_time(created)}")
+                        st.write(body)
+                keyset_pager("forum_post_pages", post_cursor)
+                # ✅ Posts are written in submit callbacks, before the fragment reruns and reads
+                with st.form("forum_reply_form", clear_on_submit=True):
+                    st.text_area("Reply", key="forum_reply")
+                    st.form_submit_button("Post reply", on_click=post_forum_reply, args=(thread_id,))
+        else:
+            st.info("Start a new discussion or browse existing conversations.")
+
+        with st.expander("➕ Start a new discussion"):
+            with st.form("forum_new_thread", clear_on_submit=True):
+                st.text_input("Title", key="forum_title")
+                st.multiselect("Tools discussed", options=all_tools, key="forum_tools")
+                st.text_area("Message", key="forum_body")
+                st.form_submit_button("Post", on_click=post_forum_thread)
+
+
 with tab7:
-# Tab 7: Discussions
-    st.title("💬 CI Discussions")
-    st.write("A searchable forum for discussing CI tools, sharing tips, successes, and learning from failures.")
-    st.text_input("Search discussions...")
-    st.info("Start a new discussion or browse existing conversations.")
+    discussion_tab()
 
 # === Feedback ===
+FEEDBACK_MESSAGES = {
+    ACCEPTED: (st.success, "Thanks! Your feedback has been received."),
+    DUPLICATE: (st.info, "We already have this feedback — thanks!"),
+    BUSY: (st.warning, "Lots of feedback is arriving right now. Please submit again in a moment."),
+}
+
+
+def submit_feedback():
+    status = get_feedback_queue().submit(
+        st.session_state["feedback_text"],
+        author=st.session_state["project_owner"],
+        project=st.session_state["project_name"],
+    )
+    st.session_state["feedback_status"] = status
+    # ✅ Keep the text when the queue is full so nothing typed is lost
+    if status in (ACCEPTED, DUPLICATE):
+        st.session_state["feedback_text"] = ""
+
+
+@st.fragment
+def feedback_tab():
+    with timer.fragment("tab.feedback", get_timing_metrics()):
+        # Tab 8: Feedback
+        st.title("📝 Toolshed Feedback")
+        st.write("Share your thoughts on the Toolshed app! What do you like? What can be improved?")
+        st.text_area("Your feedback here...", key="feedback_text")
+        st.button("Submit Feedback", on_click=submit_feedback)
+
+        status = st.session_state.pop("feedback_status", None)
+        if status in FEEDBACK_MESSAGES:
+            show, message = FEEDBACK_MESSAGES[status]
+            show(message)
+
+        feedback_queue = get_feedback_queue()
+        with st.expander("📋 Review feedback"):
+            st.caption(f"{feedback_queue.count()} submissions stored, {feedback_queue.pending()} waiting to be written.")
+            slot = st.empty()
+            if slot.button("Prepare feedback export", key="prepare_feedback"):
+                slot.download_button("Download feedback (CSV)", data=feedback_queue.export_csv(),
+                                     file_name="toolshed_feedback.csv", mime="text/csv", key="download_feedback")
+
+
 with tab8:
-# Tab 8: Feedback
-    st.title("📝 Toolshed Feedback")
-    st.write("Share your thoughts on the Toolshed app! What do you like? What can be improved?")
-    st.text_area("Your feedback here...")
-    st.button("Submit Feedback")
\ No newline at end of file
+    feedback_tab()
+
+# === Timing ===
+timer.finish(get_timing_metrics())
+if show_timing:
+    with st.sidebar.expander("⏱️ Timing (this rerun)", expanded=True):
+        st.dataframe(
+            [{"Section": name, "ms": round(seconds * 1000, 2)} for name, seconds in timer.spans],
+            use_container_width=True,
+        )
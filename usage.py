@@ -0,0 +1,315 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime
+from itertools import combinations
+
+import numpy as np
+
+from db import DATA_DIR
+
+USAGE_DB_PATH = os.path.join(DATA_DIR, "usage.db")
+
+logger = logging.getLogger("toolshed.usage")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    tool TEXT,
+    phase TEXT,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS usage_events_ts ON usage_events (ts);
+CREATE TABLE IF NOT EXISTS tool_usage (
+    tool TEXT PRIMARY KEY,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    last_used REAL,
+    project_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS exported_tools (
+    plan TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    PRIMARY KEY (plan, tool)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS exported_pairs (
+    plan TEXT NOT NULL,
+    tool_a TEXT NOT NULL,
+    tool_b TEXT NOT NULL,
+    PRIMARY KEY (plan, tool_a, tool_b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plan_tools (
+    plan TEXT PRIMARY KEY,
+    tools TEXT NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_phase (
+    phase TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (phase, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_pairs (
+    tool_a TEXT NOT NULL,
+    tool_b TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tool_a, tool_b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Event kinds
+SELECT = "select"
+SEARCH = "search"
+EXPORT = "export"
+
+# Catalog columns derived from the recorded events
+USAGE_COLUMNS = ["Usage Count", "Last Used", "Project Count"]
+
+
+def connect(path=USAGE_DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class UsageRecorder:
+    """Append-only usage event log with a batched background writer.
+
+    `record()` only enqueues, so a rerun never waits on SQLite; when the queue
+    is full the event is dropped and counted in `dropped`. The writer thread
+    inserts each batch and folds it into `tool_usage` and the rollup tables in
+    the same transaction, so neither the catalog columns nor the Analytics tab
+    ever scan the raw log. Callables in `plan_listeners` receive
+    [(plan key, tools)] of exported plans whose tools changed, after their
+    batch commits; a failing listener is logged and does not stop the writer.
+    """
+
+    def __init__(self, path=USAGE_DB_PATH, batch_size=500, flush_interval=1.0, max_pending=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self.dropped = 0
+        self.written = 0
+        self.plan_listeners = []
+        self._conn = connect(path)
+        self._thread = threading.Thread(target=self._run, name="usage-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, events):
+        try:
+            self._queue.put_nowait(events)
+        except queue.Full:
+            self.dropped += len(events)
+
+    def record(self, kind, tool=None, phase=None, **detail):
+        self._enqueue([_event(kind, tool, phase, detail)])
+
+    def record_selection(self, phase, previous, current):
+        """Record one select event per tool newly added to a phase."""
+        previous = set(previous)
+        for tool in current:
+            if tool not in previous:
+                self.record(SELECT, tool=tool, phase=phase)
+
+    def record_export(self, fmt, plan, selected_tools, key=None):
+        """One export event per tool, enqueued together so a plan is never split across batches.
+
+        `plan` is the content hash of the export, `key` the identity of the
+        plan it was made from (defaults to the hash)."""
+        detail = {"format": fmt, "plan": plan, "key": key or plan}
+        self._enqueue([
+            _event(EXPORT, tool, phase, detail)
+            for phase, tools in selected_tools.items()
+            for tool in tools
+        ])
+
+    def _drain(self, first):
+        items = [first]
+        size = len(first)
+        while size < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            items.append(item)
+            size += len(item)
+        return items
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            items = self._drain(first)
+            batch = [event for item in items for event in item]
+            try:
+                with self._conn:
+                    changed_plans = write_events(self._conn, batch)
+                self.written += len(batch)
+            except sqlite3.Error:
+                self.dropped += len(batch)
+                changed_plans = []
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+            for listener in self.plan_listeners:
+                try:
+                    listener(changed_plans)
+                except Exception:
+                    logger.exception("usage plan listener %r failed", listener)
+
+    def flush(self, timeout=10.0):
+        """Wait until everything queued so far has been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout=10)
+        self._conn.close()
+
+    def tool_usage(self):
+        return read_tool_usage(self.path)
+
+
+def _event(kind, tool, phase, detail):
+    return (time.time(), kind, tool, phase, json.dumps(detail, sort_keys=True) if detail else None)
+
+
+def aggregate(events):
+    """Fold a batch of events into per-tool usage, rollup deltas and exported plans
+    ({plan hash: (plan key, tools, last export time)})."""
+    usage = {}
+    by_phase = Counter()
+    by_day = Counter()
+    plans = {}
+    for ts, kind, tool, phase, detail in events:
+        by_day[(date.fromtimestamp(ts).isoformat(), kind)] += 1
+        if phase:
+            by_phase[(phase, kind)] += 1
+        if tool is None:
+            continue
+        count, last_used = usage.get(tool, (0, 0.0))
+        usage[tool] = (count + (kind == SELECT), max(last_used, ts))
+        if kind == EXPORT:
+            detail = json.loads(detail)
+            key, tools, _ = plans.get(detail["plan"]) or (detail.get("key", detail["plan"]), set(), ts)
+            tools.add(tool)
+            plans[detail["plan"]] = (key, tools, ts)
+    return usage, by_phase, by_day, plans
+
+
+def write_events(conn, events):
+    """Append `events` and apply them to the aggregate and rollup tables; run inside a transaction.
+
+    Returns [(plan key, sorted tools)] of plans whose exported tools changed in this batch.
+    """
+    usage, by_phase, by_day, plans = aggregate(events)
+    conn.executemany("INSERT INTO usage_events (ts, kind, tool, phase, detail) VALUES (?, ?, ?, ?, ?)", events)
+    conn.executemany(
+        """
+        INSERT INTO tool_usage (tool, usage_count, last_used) VALUES (?, ?, ?)
+        ON CONFLICT (tool) DO UPDATE SET
+            usage_count = usage_count + excluded.usage_count,
+            last_used = MAX(COALESCE(last_used, 0), excluded.last_used)
+        """,
+        [(tool, count, last_used) for tool, (count, last_used) in usage.items()],
+    )
+    conn.executemany(
+        "INSERT INTO rollup_phase VALUES (?, ?, ?) ON CONFLICT DO UPDATE SET count = count + excluded.count",
+        [(phase, kind, count) for (phase, kind), count in by_phase.items()],
+    )
+    conn.executemany(
+        "INSERT INTO rollup_daily VALUES (?, ?, ?) ON CONFLICT DO UPDATE SET count = count + excluded.count",
+        [(day, kind, count) for (day, kind), count in by_day.items()],
+    )
+    # Project Count and tool pairs count a project (plan key) once per tool and per pair,
+    # however often it is re-exported with other tools, names or dates
+    exported = {}
+    for key, tools, _ in plans.values():
+        exported.setdefault(key, set()).update(tools)
+    pairs = Counter()
+    for key, tools in exported.items():
+        tools = sorted(tools)
+        new_tools = [
+            (tool,) for tool in tools
+            if conn.execute("INSERT OR IGNORE INTO exported_tools VALUES (?, ?)", (key, tool)).rowcount
+        ]
+        conn.executemany("UPDATE tool_usage SET project_count = project_count + 1 WHERE tool = ?", new_tools)
+        pairs.update(
+            (a, b) for a, b in combinations(tools, 2)
+            if conn.execute("INSERT OR IGNORE INTO exported_pairs VALUES (?, ?, ?)", (key, a, b)).rowcount
+        )
+    conn.executemany(
+        "INSERT INTO rollup_pairs VALUES (?, ?, ?) ON CONFLICT DO UPDATE SET count = count + excluded.count",
+        [(a, b, count) for (a, b), count in pairs.items()],
+    )
+    # The recommender counts each plan once, with the tools of its latest export
+    changed_plans = {}
+    for key, tools, ts in sorted(plans.values(), key=lambda plan: plan[2]):
+        tools = json.dumps(sorted(tools))
+        stored = conn.execute("SELECT tools FROM plan_tools WHERE plan = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT INTO plan_tools VALUES (?, ?, ?) ON CONFLICT DO UPDATE SET"
+            " tools = excluded.tools, updated = excluded.updated",
+            (key, tools, ts),
+        )
+        if stored is None or stored[0] != tools:
+            changed_plans[key] = json.loads(tools)
+    conn.execute(
+        "INSERT INTO rollup_meta VALUES ('version', 1) ON CONFLICT DO UPDATE SET value = value + 1"
+    )
+    return list(changed_plans.items())
+
+
+def read_tool_usage(path=USAGE_DB_PATH):
+    """Tool name -> (usage count, last used timestamp, project count)."""
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        rows = conn.execute("SELECT tool, usage_count, last_used, project_count FROM tool_usage").fetchall()
+    finally:
+        conn.close()
+    return {tool: (count, last_used, projects) for tool, count, last_used, projects in rows}
+
+
+def apply_usage(frame, usage):
+    """Catalog frame with Usage Count / Last Used / Project Count derived from the aggregates.
+
+    Counts from the CSV are kept as a baseline and recorded usage is added on top."""
+    recorded = [usage.get(name, (0, None, 0)) for name in frame["Tool Name"]]
+    updated = frame.copy()
+    for column, position in (("Usage Count", 0), ("Project Count", 2)):
+        baseline = frame[column].fillna(0).astype("int64") if column in frame else 0
+        updated[column] = baseline + np.array([values[position] for values in recorded], dtype=np.int64)
+    previous = frame["Last Used"] if "Last Used" in frame else [None] * len(frame)
+    updated["Last Used"] = [
+        datetime.fromtimestamp(last_used).strftime("%d-%m-%Y") if last_used else last
+        for (_, last_used, _), last in zip(recorded, previous)
+    ]
+    return updated
@@ -0,0 +1,288 @@
+import mimetypes
+import mmap
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from catalog import link_entries
+from db import DATA_DIR, get_pool
+from forum import match_expression
+from repository import CHUNK_SIZE, blob_path, write_blob
+
+VIDEO_DIR = os.path.join(DATA_DIR, "videos")
+
+# Playback and repository downloads are served by a small range-request server next to Streamlit.
+# TOOLSHED_VIDEO_URL is the address browsers use to reach it (e.g. a path on the app's proxy);
+# there is no default, since a guessed address only works for a browser on this machine
+VIDEO_HOST = os.environ.get("TOOLSHED_VIDEO_HOST", "127.0.0.1")
+VIDEO_PORT = int(os.environ.get("TOOLSHED_VIDEO_PORT", "8601"))
+VIDEO_URL = os.environ.get("TOOLSHED_VIDEO_URL") or None
+
+VIDEO_TYPES = ["mp4", "webm", "ogg", "mov", "m4v"]
+SEND_CHUNK = 256 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    title TEXT NOT NULL,
+    phase TEXT,
+    uploader TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    keywords TEXT NOT NULL DEFAULT '',
+    size INTEGER NOT NULL,
+    mime TEXT NOT NULL,
+    uploaded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_uploaded ON videos (uploaded, id);
+CREATE INDEX IF NOT EXISTS videos_phase ON videos (phase, uploaded, id);
+CREATE INDEX IF NOT EXISTS videos_sha256 ON videos (sha256);
+CREATE TABLE IF NOT EXISTS video_tools (
+    tool TEXT NOT NULL,
+    video_id INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE,
+    PRIMARY KEY (tool, video_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS video_tools_video ON video_tools (video_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, description, keywords, content='videos', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts (rowid, title, description, keywords)
+    VALUES (new.id, new.title, new.description, new.keywords);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title, description, keywords)
+    VALUES ('delete', old.id, old.title, old.description, old.keywords);
+END;
+"""
+
+_COLUMNS = "v.id, v.title, v.phase, v.uploader, v.description, v.keywords, v.uploaded, v.sha256, v.size, v.mime"
+
+
+class VideoLibrary:
+    """Project videos on local disk, one blob per content hash, searchable by
+    keyword (FTS5 over title, description and keywords), PDCA phase and tool."""
+
+    def __init__(self, pool=None, root=VIDEO_DIR):
+        self.pool = pool or get_pool()
+        self.pool.executescript(_SCHEMA)
+        self.blobs_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def path(self, sha256):
+        return blob_path(self.blobs_dir, sha256)
+
+    def add(self, source, name, title, uploader, phase=None, tools=(), keywords="", description="",
+            chunk_size=CHUNK_SIZE):
+        """Store a video file object and its metadata; returns (video id, sha256)."""
+        sha256, size = write_blob(self.blobs_dir, source, chunk_size)
+        mime = mimetypes.guess_type(name)[0] or "video/mp4"
+        with self.pool.connection() as conn:
+            video_id = conn.execute(
+                "INSERT INTO videos (sha256, title, phase, uploader, description, keywords, size, mime, uploaded)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha256, title, phase or None, uploader, description, keywords, size, mime, time.time()),
+            ).lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO video_tools (tool, video_id) VALUES (?, ?)",
+                [(tool, video_id) for tool in tools],
+            )
+        return video_id, sha256
+
+    def search(self, query="", phase=None, tool=None, limit=30):
+        """(id, title, phase, uploader, description, keywords, uploaded, sha256, size, mime), newest first."""
+        sql = f"SELECT {_COLUMNS} FROM videos v"
+        clauses, params = [], []
+        expression = match_expression(query)
+        if expression:
+            sql += " JOIN videos_fts ON videos_fts.rowid = v.id"
+            clauses.append("videos_fts MATCH ?")
+            params.append(expression)
+        if tool:
+            sql += " JOIN video_tools vt ON vt.video_id = v.id"
+            clauses.append("vt.tool = ?")
+            params.append(tool)
+        if phase:
+            clauses.append("v.phase = ?")
+            params.append(phase)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY v.uploaded DESC, v.id DESC LIMIT ?"
+        with self.pool.connection() as conn:
+            return conn.execute(sql, (*params, limit)).fetchall()
+
+    def tools(self, video_id):
+        with self.pool.connection() as conn:
+            return [tool for (tool,) in conn.execute(
+                "SELECT tool FROM video_tools WHERE video_id = ? ORDER BY tool", (video_id,)
+            )]
+
+    def mime(self, sha256):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT mime FROM videos WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone()
+        return row[0] if row else None
+
+
+def catalog_videos(frame):
+    """{row position: [video URLs]} from the catalog's Video1-Video3 columns."""
+    videos = {}
+    for column in ["Video1", "Video2", "Video3"]:
+        if column not in frame.columns:
+            continue
+        positions, links = link_entries(frame[column])
+        for position, link in zip(positions.tolist(), links):
+            link = str(link).strip()
+            # Only web links: st.video would treat anything else as a local file path
+            if link.startswith(("http://", "https://")):
+                videos.setdefault(position, []).append(link)
+    return videos
+
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single-range `Range` header; None for the whole
+    file, ValueError when it cannot be satisfied."""
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class MappedFiles:
+    """Read-only memory maps of served blobs, shared by every viewer.
+
+    Pages come from the OS page cache; a range is sent as a memoryview
+    slice of the map, so no part of a file is copied into Python bytes.
+    """
+
+    def __init__(self, max_open=64):
+        self.max_open = max_open
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            mapped = self._maps.get(path)
+            if mapped is None:
+                if len(self._maps) >= self.max_open:
+                    # Drop the oldest map; views still being sent keep it alive until they finish
+                    self._maps.pop(next(iter(self._maps)))
+                with open(path, "rb") as blob:
+                    mapped = self._maps[path] = mmap.mmap(blob.fileno(), 0, access=mmap.ACCESS_READ)
+            return mapped
+
+
+def _handler(sources, maps):
+    """`sources` maps the first path segment to a store with path(sha256) and mime(sha256)."""
+
+    class VideoRangeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def end_headers(self):
+            # Every response, errors included: browsers must not sniff blobs into HTML
+            self.send_header("X-Content-Type-Options", "nosniff")
+            super().end_headers()
+
+        def do_HEAD(self):
+            self._serve(send_body=False)
+
+        def do_GET(self):
+            self._serve(send_body=True)
+
+        def _serve(self, send_body):
+            url = urlsplit(self.path)
+            kind, _, sha256 = url.path.strip("/").partition("/")
+            source = sources.get(kind)
+            mime = source.mime(sha256) if source and re.fullmatch(r"[0-9a-f]{64}", sha256) else None
+            path = source.path(sha256) if mime else None
+            if path is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+                self.send_error(404)
+                return
+            if kind == "videos" and not mime.startswith("video/"):
+                mime = "application/octet-stream"
+            mapped = maps.get(path)
+            size = len(mapped)
+            try:
+                requested = parse_range(self.headers.get("Range"), size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start, end = requested or (0, size - 1)
+            self.send_response(206 if requested else 200)
+            self.send_header("Content-Type", mime)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+            if requested:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            if kind == "files":
+                # Uploads are untrusted: always a download, never rendered on the app's origin
+                name = parse_qs(url.query).get("name", [sha256])[0]
+                self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(name)}")
+            self.end_headers()
+            if not send_body:
+                return
+            view = memoryview(mapped)
+            try:
+                for offset in range(start, end + 1, SEND_CHUNK):
+                    self.wfile.write(view[offset:min(offset + SEND_CHUNK, end + 1)])
+            except (BrokenPipeError, ConnectionResetError):
+                # Browsers drop range requests as soon as they have enough buffered
+                pass
+            finally:
+                view.release()
+
+    return VideoRangeHandler
+
+
+class VideoServer:
+    """Serves /videos/<sha256> and, given a FileRepository, /files/<sha256> downloads
+    with HTTP range requests from memory-mapped blobs, on a daemon thread."""
+
+    def __init__(self, library, host=VIDEO_HOST, port=VIDEO_PORT, base_url=VIDEO_URL, files=None):
+        if not base_url:
+            raise ValueError("VideoServer needs the URL browsers use to reach it (set TOOLSHED_VIDEO_URL)")
+        self.base_url = base_url.rstrip("/")
+        self.maps = MappedFiles()
+        sources = {"videos": library}
+        if files is not None:
+            sources["files"] = files
+        self.httpd = ThreadingHTTPServer((host, port), _handler(sources, self.maps))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="video-server", daemon=True)
+        self._thread.start()
+
+    def url(self, sha256):
+        return f"{self.base_url}/videos/{sha256}"
+
+    def file_url(self, sha256, name):
+        """Download link of a repository blob, saved by the browser as `name`."""
+        return f"{self.base_url}/files/{sha256}?name={quote(name)}"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()